@@ -1,6 +1,16 @@
 import streamlit as st
 import pandas as pd
 import os
+import hashlib
+
+from utils import outofcore
+from utils.ui import data_browser, load_css, memory_report
+from utils.backend import FILTER_OPS
+from utils.incremental import DatasetProfile, check_schema, current_profile, store_profile
+from utils.memory import dataset_token, load_dataset, store_dataset
+from utils.missing import append_null_bitmaps
+from utils.resultcache import append_column_hashes, keep_column_hashes
+from utils.loaders import UPLOAD_TYPES, file_format, list_columns, list_sheets, read_table
 
 st.set_page_config(
     page_title="Auto Data Explorer",
@@ -8,20 +18,12 @@ st.set_page_config(
     layout="wide"
 )
 
-# ===== Helper: Load CSS =====
-def load_css():
-    css_files = ["assets/style.css", "assets/animation.css"]
-    for css in css_files:
-        if os.path.exists(css):
-            with open(css) as f:
-                st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
 load_css()
 
 # ===== Sidebar =====
 with st.sidebar:
     st.markdown("<h2 class='sidebar-title'>⚙️ Controls</h2>", unsafe_allow_html=True)
-    st.write("1. Upload CSV / Excel file")
+    st.write("1. Upload CSV / Excel / Parquet / Feather file")
     st.write("2. Go to pages: Data Overview, Charts, Summary Report")
     st.markdown("---")
     st.write("👨‍💻 *Project: Auto Data Explorer*")
@@ -31,37 +33,189 @@ st.markdown("<p class='subtitle'>Upload • Analyze • Visualize – All in one
 
 # ===== File Uploader =====
 uploaded_file = st.file_uploader(
-    "Upload your dataset (CSV or Excel)",
-    type=["csv", "xlsx", "xls"],
+    "Upload your dataset (CSV, Excel, Parquet or Feather – "
+    + " / ".join(f".csv.{ext}" for ext in ("gz", "zst") if ext in UPLOAD_TYPES)
+    + " ok)",
+    type=UPLOAD_TYPES,
     help="Choose any tabular dataset file"
 )
 
+def show_loaded(df: pd.DataFrame, name: str, total_rows: int | None = None):
+    st.success(f"✅ File uploaded successfully: **{name}**")
+    st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+    st.write("### 👀 Browse Data")
+    data_browser(df, "home_browser", ooc=st.session_state.get("ooc"))
+    if total_rows is None:
+        st.write("**Shape:** ", df.shape)
+    else:
+        st.write("**Shape:** ", (total_rows, df.shape[1]))
+        st.caption(f"Out-of-core (DuckDB): charts use a {len(df):,}-row sample, tables use every row.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    st.info("➡️ Now go to **Data Overview**, **Charts & Animation**, or **Summary Report** from the left sidebar `Pages` section.")
+
+
+def load_options(uploaded_file) -> tuple[list[str] | None, list[tuple], list[str] | None]:
+    """Pick sheets, columns (and an optional row filter) before the file is read."""
+    sheets = None
+    if file_format(uploaded_file.name) == "excel":
+        all_sheets = list_sheets(uploaded_file.getvalue(), uploaded_file.name)
+        if len(all_sheets) > 1:
+            sheets = st.multiselect(
+                "Sheets to load (several sheets are stacked with a 'Sheet' column)",
+                all_sheets,
+                default=all_sheets[:1],
+                key="load_sheets",
+            )
+        sheets = sheets or all_sheets[:1]
+
+    with st.expander("⚙️ Load options – only read what you need", expanded=False):
+        all_columns = list_columns(uploaded_file, uploaded_file.name, sheets[0] if sheets else 0)
+        columns = st.multiselect("Columns to load", all_columns, default=all_columns, key="load_cols")
+
+        load_filters = []
+        if st.checkbox("Filter rows while loading (Parquet skips whole row groups)", key="load_filter_on"):
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                f_col = st.selectbox("Column", all_columns, key="load_f_col")
+            with c2:
+                f_op = st.selectbox("Operator", FILTER_OPS, key="load_f_op")
+            with c3:
+                f_val = st.text_input("Value", key="load_f_val")
+            if f_val != "":
+                load_filters.append((f_col, f_op, f_val))
+
+    if not columns or len(columns) == len(all_columns):
+        columns = None
+    return columns, load_filters, sheets
+
+
+def append_rows(load_filters: list[tuple], sheets: list[str] | None):
+    """Parse only a new chunk, check it against the loaded columns, update the stats."""
+    with st.expander("➕ Append new rows (e.g. the latest hourly CSV drop)"):
+        new_file = st.file_uploader("File with new rows (same columns)", type=UPLOAD_TYPES, key="append_file")
+        if new_file is None:
+            return
+        # by content: the same drop uploaded twice is added once
+        digest = hashlib.sha1(new_file.getvalue()).hexdigest()
+        appended = st.session_state.setdefault("appended", [])
+        if digest in appended:
+            st.caption("These rows are already added.")
+            return
+        try:
+            base = load_dataset(st.session_state)
+            header = list_columns(new_file, new_file.name)
+            chunk = read_table(
+                new_file,
+                new_file.name,
+                columns=[c for c in base.columns if c in header],
+                filters=load_filters,
+            )
+            if sheets and len(sheets) > 1 and "Sheet" not in chunk.columns:
+                # stacked sheets carry a 'Sheet' column – new rows are labelled by their file
+                chunk = chunk.assign(Sheet=new_file.name)
+            chunk = check_schema(base, chunk)
+        except Exception as e:
+            st.error(f"❌ New rows not added: {e}")
+            return
+        profile = current_profile(st.session_state, base) or DatasetProfile(base)
+        profile.append(chunk)
+        combined = pd.concat([base, chunk], ignore_index=True)
+        # only the new rows are hashed; results over columns they leave empty stay cached
+        hashes = append_column_hashes(st.session_state, base, combined)
+        before = dataset_token(st.session_state)
+        store_dataset(st.session_state, combined)
+        keep_column_hashes(st.session_state, hashes)
+        append_null_bitmaps(before, dataset_token(st.session_state), chunk)
+        store_profile(st.session_state, profile)
+        appended.append(digest)
+        st.success(
+            f"➕ Added {len(chunk):,} rows. Updated columns: {', '.join(map(str, profile.changed_columns)) or 'none'}"
+        )
+
+
+def close_out_of_core():
+    # replaced dataset: its connection, cached scans and spooled upload copy go
+    current = st.session_state.pop("ooc", None)
+    if current is not None:
+        current.close()
+
+
+def open_out_of_core(path: str):
+    current = st.session_state.get("ooc")
+    if current is not None and current.path == os.path.abspath(path) and not current.changed():
+        return current  # already registered – no re-scan on rerun (edited in place -> opened again)
+    close_out_of_core()
+    outofcore.cleanup_stale()  # left behind by sessions that simply ended
+    ds = outofcore.DuckDBDataset(path)
+    st.session_state["ooc"] = ds
+    store_dataset(st.session_state, ds.sample())
+    st.session_state["file_name"] = ds.file_name
+    return ds
+
+
+# ===== Very large files: query in place with DuckDB =====
+# only files inside the configured data folder (ADE_DATA_DIR) can be opened by path
+if outofcore.is_available() and outofcore.data_dir() is not None:
+    with st.expander("📦 Very large file on this server? Open it out-of-core (DuckDB)"):
+        st.caption(
+            f"CSV / Parquet in `{outofcore.data_dir()}` is queried from disk – it is never loaded fully into memory."
+        )
+        ooc_path = st.text_input("File name in the data folder", key="ooc_path")
+        if st.button("Open out-of-core") and ooc_path:
+            try:
+                open_out_of_core(outofcore.server_path(ooc_path))
+            except Exception as e:
+                st.error(f"❌ Error opening file: {e}")
+
 if uploaded_file is not None:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
+        big = uploaded_file.size > outofcore.ooc_threshold_bytes()
+        if (
+            big
+            and outofcore.is_available()
+            and uploaded_file.name.lower().endswith(outofcore.OOC_SUFFIXES)
+        ):
+            ds = open_out_of_core(outofcore.spool_upload(uploaded_file))
+            st.session_state["file_name"] = uploaded_file.name
+            show_loaded(load_dataset(st.session_state), uploaded_file.name, total_rows=ds.num_rows)
         else:
-            df = pd.read_excel(uploaded_file)
-
-        st.session_state["df"] = df
-        st.session_state["file_name"] = uploaded_file.name
+            columns, load_filters, sheets = load_options(uploaded_file)
+            # same file + same options -> keep the frame, no re-parse on rerun
+            load_key = (uploaded_file.file_id, tuple(columns or ()), tuple(load_filters), tuple(sheets or ()))
+            if st.session_state.get("load_key") != load_key or load_dataset(st.session_state) is None:
+                loaded = read_table(
+                    uploaded_file,
+                    uploaded_file.name,
+                    columns=columns,
+                    filters=load_filters,
+                    sheets=sheets,
+                )
+                store_dataset(st.session_state, loaded)
+                st.session_state["load_key"] = load_key
+                store_profile(st.session_state, None)
+                st.session_state.pop("appended", None)
+            append_rows(load_filters, sheets)
+            df = load_dataset(st.session_state)
 
-        st.success(f"✅ File uploaded successfully: **{uploaded_file.name}**")
-        st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
-        st.write("### 👀 Quick Preview")
-        st.dataframe(df.head())
-        st.write("**Shape:** ", df.shape)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-        st.info("➡️ Now go to **Data Overview**, **Charts & Animation**, or **Summary Report** from the left sidebar `Pages` section.")
+            st.session_state["file_name"] = uploaded_file.name
+            close_out_of_core()
+            show_loaded(df, uploaded_file.name)
     except Exception as e:
         st.error(f"❌ Error reading file: {e}")
+elif "ooc" in st.session_state:
+    ds = st.session_state["ooc"]
+    # the sample may have been evicted under memory pressure – draw it again
+    df = load_dataset(st.session_state)
+    if df is None:
+        df = store_dataset(st.session_state, ds.sample())
+    show_loaded(df, ds.file_name, total_rows=ds.num_rows)
 else:
     st.markdown(
         """
         <div class='glass-card animated-pulse'>
             <h3>🚀 Start Here</h3>
-            <p>Upload any CSV/Excel file to begin automatic exploration.</p>
+            <p>Upload any CSV/Excel/Parquet/Feather file to begin automatic exploration.</p>
             <ul>
                 <li>Preview your data</li>
                 <li>Check summary & missing values</li>
@@ -72,3 +226,5 @@ else:
         """,
         unsafe_allow_html=True
     )
+
+memory_report()
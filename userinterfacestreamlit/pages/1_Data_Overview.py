@@ -1,36 +1,33 @@
 import streamlit as st
 from utils.analysis import (
     get_basic_info,
-    get_missing_values,
     get_column_types,
     get_descriptive_stats,
 )
-
-import os
+from utils.charts import missingness_matrix
+from utils.incremental import current_profile
+from utils.memory import dataset_token, load_dataset
+from utils.missing import null_bitmaps
+from utils.ui import data_browser, load_css
 
 st.set_page_config(page_title="Data Overview | Auto Data Explorer", layout="wide")
 
-def load_css():
-    css_files = ["assets/style.css", "assets/animation.css"]
-    for css in css_files:
-        if os.path.exists(css):
-            with open(css) as f:
-                st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
 load_css()
 
 st.markdown("<h1 class='page-title slide-in'>📊 Data Overview</h1>", unsafe_allow_html=True)
 
-if "df" not in st.session_state:
+df = load_dataset(st.session_state)
+if df is None:
     st.warning("⚠️ No dataset found. Please upload a file in the **Home** page first.")
     st.stop()
 
-df = st.session_state["df"]
 file_name = st.session_state.get("file_name", "Uploaded Dataset")
+# out-of-core dataset (DuckDB) – df is then only a row sample of it
+ooc = st.session_state.get("ooc")
 
 st.markdown(f"<p class='subtitle'>File: <b>{file_name}</b></p>", unsafe_allow_html=True)
 
-basic = get_basic_info(df)
+basic = ooc.basic_info() if ooc is not None else get_basic_info(df)
 
 col1, col2 = st.columns(2)
 
@@ -47,14 +44,31 @@ with col2:
     st.write(basic["column_names"])
     st.markdown("</div>", unsafe_allow_html=True)
 
-st.markdown("### 🔍 Data Preview")
-st.dataframe(df.head())
+st.markdown("### 🔍 Data Browser")
+data_browser(df, "overview_browser", ooc=ooc)
 
 with st.expander("📌 Column Types"):
-    st.dataframe(get_column_types(df))
+    st.dataframe(ooc.column_types() if ooc is not None else get_column_types(df))
 
 with st.expander("❗ Missing Values"):
-    st.dataframe(get_missing_values(df))
+    if ooc is not None:
+        st.dataframe(ooc.missing_counts())
+    else:
+        # counts: the running profile while it matches (kept up to date on append)
+        profile = current_profile(st.session_state, df)
+        # packed null bitmaps (1 bit per cell), built once and extended on append;
+        # the tables below are derived from them (and kept)
+        nulls = null_bitmaps(df, token=dataset_token(st.session_state))
+        st.dataframe(profile.missing_counts() if profile is not None else nulls.missing_counts())
+        if not nulls.with_nulls:
+            st.success("✅ No missing values.")
+        else:
+            st.plotly_chart(missingness_matrix(nulls.by_row_bucket()), use_container_width=True)
+            st.write("🧩 Most common missing patterns (per row)")
+            st.dataframe(nulls.patterns())
+            if len(nulls.with_nulls) >= 2:
+                st.write("🔗 Columns most often missing together")
+                st.dataframe(nulls.top_co_missing())
 
 with st.expander("📊 Descriptive Statistics"):
-    st.dataframe(get_descriptive_stats(df))
+    st.dataframe(ooc.describe() if ooc is not None else get_descriptive_stats(df))
@@ -1,7 +1,7 @@
+from contextlib import contextmanager
+
 import streamlit as st
-import os
 import pandas as pd
-import plotly.express as px
 
 from utils.charts import (
     bar_chart,
@@ -9,12 +9,33 @@ from utils.charts import (
     scatter_chart,
     pie_chart,
     heatmap_corr,
+    density_scatter_matrix,
     scatter_3d_chart,
     animated_bar_chart,
     animated_scatter_chart,
     bar_race_chart,
     line_with_forecast,
+    forecast_small_multiples,
+    histogram_from_bins,
+    top_corr_pairs,
 )
+from utils.analysis import get_descriptive_stats
+from utils.backend import AGG_FUNCS, apply_filters, get_backend
+from utils.binning import LARGE_ROWS
+from utils.forecast import MODELS, PLOT_SERIES, batch_forecast
+from utils.incremental import current_profile
+from utils.jobs import JobCancelled
+from utils.lazy import LazyModule
+from utils.memory import dataset_token, load_dataset
+from utils.resultcache import cached, cached_job, columns_hash, dataset_hash
+from utils.timeseries import MAX_FRAMES, MAX_POINTS, datetime_columns
+from utils.ui import ensure_job, filter_panel, job_result, load_css, retry_requested, submit_job
+
+# plotly is imported on the first chart, not at page start
+px = LazyModule("plotly.express")
+
+# charts in Auto Analysis (for its progress bar)
+AUTO_CHARTS = 15
 
 st.set_page_config(
     page_title="Smart Analytics & Charts | Auto Data Explorer",
@@ -23,299 +44,382 @@ st.set_page_config(
 
 # ================== Common helpers ==================
 
-def load_css():
-    css_files = ["assets/style.css", "assets/animation.css"]
-    for css in css_files:
-        if os.path.exists(css):
-            with open(css) as f:
-                st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-
 def show_chart_with_download(fig, name: str):
     """Show chart + download button (user friendly)."""
     st.plotly_chart(fig, use_container_width=True)
-    html_bytes = fig.to_html(full_html=False, include_plotlyjs="cdn").encode("utf-8")
+    # HTML is built only when the button is clicked – no bytes kept per chart
     st.download_button(
         label="⬇ Download chart (HTML)",
-        data=html_bytes,
+        data=lambda: fig.to_html(full_html=False, include_plotlyjs="cdn").encode("utf-8"),
         file_name=f"{name}.html",
         mime="text/html",
     )
 
 
-def _filter_single(df: pd.DataFrame, col: str, op: str, val):
-    """One filter – like df.loc[…]"""
-    try:
-        if op == "==":
-            return df.loc[df[col] == val]
-        if op == "!=":
-            return df.loc[df[col] != val]
-        if op == ">":
-            return df.loc[df[col] > val]
-        if op == "<":
-            return df.loc[df[col] < val]
-        if op == ">=":
-            return df.loc[df[col] >= val]
-        if op == "<=":
-            return df.loc[df[col] <= val]
-        if op == "contains":
-            return df.loc[df[col].astype(str).str.contains(str(val), case=False, na=False)]
-    except Exception:
-        return df
-    return df
-
-
-def apply_filters(df: pd.DataFrame) -> pd.DataFrame:
-    """Simple 2-filter panel, but concept = df.loc[…]"""
-    with st.expander("🔎 Optional Filters (uses loc-style idea)", expanded=False):
-        st.caption("Example logic: df.loc[df['Gender'] == 'Male']")
-
-        # Filter 1
-        enable_1 = st.checkbox("Enable Filter 1")
-        if enable_1:
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                f1_col = st.selectbox("Column 1", df.columns, key="f1_col")
-            with c2:
-                f1_op = st.selectbox("Operator 1", ["==", "!=", ">", "<", ">=", "<=", "contains"], key="f1_op")
-            with c3:
-                if pd.api.types.is_numeric_dtype(df[f1_col]):
-                    f1_val = st.number_input("Value 1", key="f1_val")
-                else:
-                    f1_val = st.text_input("Value 1", key="f1_val")
-
-            df = _filter_single(df, f1_col, f1_op, f1_val)
-
-        # Filter 2
-        enable_2 = st.checkbox("Enable Filter 2")
-        if enable_2:
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                f2_col = st.selectbox("Column 2", df.columns, key="f2_col")
-            with c2:
-                f2_op = st.selectbox("Operator 2", ["==", "!=", ">", "<", ">=", "<=", "contains"], key="f2_op")
-            with c3:
-                if pd.api.types.is_numeric_dtype(df[f2_col]):
-                    f2_val = st.number_input("Value 2", key="f2_val")
-                else:
-                    f2_val = st.text_input("Value 2", key="f2_val")
-
-            df = _filter_single(df, f2_col, f2_op, f2_val)
-
-    return df
-
+def result_key(mode: str, filters: list[tuple], cols: list, *params) -> tuple:
+    """Shared-cache key of a result that reads only `cols` (+ the filtered columns)."""
+    used = list(cols) + [f[0] for f in filters]
+    return (mode, columns_hash(st.session_state, df, used), tuple(filters), *params)
 
-# ================== PAGE START ==================
-
-load_css()
-
-st.markdown("<h1 class='page-title slide-in'>📈 Smart Analytics & Charts</h1>", unsafe_allow_html=True)
-st.caption("Upload • Analyze • Visualize – A fast business insights platform")
-
-if "df" not in st.session_state:
-    st.warning("⚠️ No dataset found. Please upload a file in the **Home** page first.")
-    st.stop()
-
-df = st.session_state["df"]
-
-numeric_cols = df.select_dtypes(include="number").columns.tolist()
-all_cols = df.columns.tolist()
-cat_cols = [c for c in all_cols if c not in numeric_cols]
-
-if not all_cols:
-    st.error("Dataset has no columns.")
-    st.stop()
 
-st.markdown("<div class='glass-card animated-float'>", unsafe_allow_html=True)
+def data_token(filters: list[tuple]) -> tuple:
+    """Identifies the filtered frame for the chart helpers' caches – no re-hash of the data."""
+    return dataset_hash(st.session_state, df), tuple(filters)
 
-# ============= STEP 1 – Select Mode (Simple) =============
 
-mode = st.radio(
-    "🧠 What do you want to do?",
-    [
-        "⭐ Auto Analysis (recommended)",
-        "📊 Simple Chart",
-        "📌 Group & Aggregate (sum / mean / count)",
-        "📈 Pivot Table (rows × columns × values)",
-        "🎞 Advanced / Animated Charts",
-    ],
-    horizontal=False,
-)
+def profile_for(filters: list[tuple]):
+    """Running stats kept up to date on append – valid for the unfiltered data only."""
+    return None if filters else current_profile(st.session_state, df)
 
-# =========================================================
-# MODE 1 – AUTO ANALYSIS (Beginner friendly, 1-click)
-# =========================================================
-if mode.startswith("⭐ Auto Analysis"):
-    st.subheader("⭐ Auto Analysis – important insights in one click")
 
-    work_df = apply_filters(df.copy())
+def build_auto_analysis(job, work_df: pd.DataFrame, filters: list[tuple], ooc, profile, full_df: pd.DataFrame, token):
+    """
+    Auto Analysis as a background job: summary table + up to 15 charts.
+    Returns (row count, describe table, [(title, caption, fig, file name), ...],
+    [(title, error), ...]) – a chart that fails is listed, the others are still drawn.
+    """
+    job.report(0.0, "Basic summary")
+    if ooc is not None:
+        rows, desc = ooc.count(filters), ooc.describe(filters)
+    else:
+        rows, desc = len(work_df), get_descriptive_stats(work_df)
 
-    # ---------- Basic summary (table, not a chart) ----------
-    st.write("### 1) Basic summary of your data")
-    st.write(f"Rows: {work_df.shape[0]} | Columns: {work_df.shape[1]}")
+    charts, errors = [], []
 
-    try:
-        desc = work_df.describe(include="all").T
-    except Exception:
-        desc = work_df.describe().T
-    st.dataframe(desc)
+    def add(title, caption, fig, name):
+        charts.append((title, caption, fig, name))
+        job.report((len(charts) + len(errors)) / AUTO_CHARTS, title)  # also where a cancel stops the job
 
-    st.write("---")
-    st.write("### 2) Auto generated charts (simple to read)")
+    @contextmanager
+    def attempt(title):
+        # e.g. negative bubble sizes – this chart is skipped, not the whole analysis
+        try:
+            yield
+        except JobCancelled:
+            raise
+        except Exception as e:
+            errors.append((title, (str(e).strip().splitlines() or [type(e).__name__])[0]))
+            job.report((len(charts) + len(errors)) / AUTO_CHARTS, title)
 
     # Detect column types again for safety
     num_cols = work_df.select_dtypes(include="number").columns.tolist()
     cat_cols = [c for c in work_df.columns if c not in num_cols]
 
-    # Common index for some charts
+    # Common index for some charts (assign = new frame; the session's data stays untouched)
     if len(work_df) > 0:
-        work_df["Auto_Index"] = range(len(work_df))
-
-    chart_no = 1  # for chart numbering
+        work_df = work_df.assign(Auto_Index=range(len(work_df)))
 
     # ---------- Chart 1: Histogram ----------
     if num_cols:
         col = num_cols[0]
-        st.write(f"#### Chart {chart_no}: Histogram of `{col}`")
-        st.caption("Shows how the values of this column are spread.")
-        fig = px.histogram(work_df, x=col, nbins=20)
-        show_chart_with_download(fig, f"AUTO_hist_{col}")
-        chart_no += 1
+        title = f"Histogram of `{col}`"
+        caption = "Shows how the values of this column are spread."
+        with attempt(title):
+            if ooc is not None:
+                fig = histogram_from_bins(ooc.histogram(col, nbins=20, filters=filters), col)
+            else:
+                fig = px.histogram(work_df, x=col, nbins=20)
+            add(title, caption, fig, f"AUTO_hist_{col}")
 
     # ---------- Chart 2: Density (KDE style) ----------
     if num_cols:
         col = num_cols[0]
-        st.write(f"#### Chart {chart_no}: Density of `{col}`")
-        st.caption("Smooth curve that shows where most values are concentrated.")
-        fig = px.density_contour(work_df, x=col)
-        show_chart_with_download(fig, f"AUTO_density_{col}")
-        chart_no += 1
+        title = f"Density of `{col}`"
+        caption = "Smooth curve that shows where most values are concentrated."
+        with attempt(title):
+            fig = px.density_contour(work_df, x=col)
+            add(title, caption, fig, f"AUTO_density_{col}")
 
     # ---------- Chart 3: Box Plot (Outliers) ----------
     if num_cols:
         col = num_cols[0]
-        st.write(f"#### Chart {chart_no}: Box plot of `{col}`")
-        st.caption("Helps you see minimum, maximum, median and outliers.")
-        fig = px.box(work_df, y=col)
-        show_chart_with_download(fig, f"AUTO_box_{col}")
-        chart_no += 1
+        title = f"Box plot of `{col}`"
+        caption = "Helps you see minimum, maximum, median and outliers."
+        with attempt(title):
+            fig = px.box(work_df, y=col)
+            add(title, caption, fig, f"AUTO_box_{col}")
 
     # ---------- Chart 4: Trend Line over index ----------
     if num_cols and "Auto_Index" in work_df.columns:
         col = num_cols[0]
-        st.write(f"#### Chart {chart_no}: Trend of `{col}` over data order")
-        st.caption("Shows whether values go up or down as we move through the rows.")
-        fig = px.line(work_df, x="Auto_Index", y=col)
-        show_chart_with_download(fig, f"AUTO_trend_{col}")
-        chart_no += 1
+        title = f"Trend of `{col}` over data order"
+        caption = "Shows whether values go up or down as we move through the rows."
+        with attempt(title):
+            fig = px.line(work_df, x="Auto_Index", y=col)
+            add(title, caption, fig, f"AUTO_trend_{col}")
 
     # ---------- Chart 5: Area Chart ----------
     if num_cols and "Auto_Index" in work_df.columns:
         col = num_cols[0]
-        st.write(f"#### Chart {chart_no}: Area chart of `{col}`")
-        st.caption("Similar to a line chart, but filled area makes pattern more visible.")
-        fig = px.area(work_df, x="Auto_Index", y=col)
-        show_chart_with_download(fig, f"AUTO_area_{col}")
-        chart_no += 1
+        title = f"Area chart of `{col}`"
+        caption = "Similar to a line chart, but filled area makes pattern more visible."
+        with attempt(title):
+            fig = px.area(work_df, x="Auto_Index", y=col)
+            add(title, caption, fig, f"AUTO_area_{col}")
 
     # ---------- Chart 6: Numeric vs Numeric Scatter ----------
     if len(num_cols) >= 2:
         x_col, y_col = num_cols[0], num_cols[1]
-        st.write(f"#### Chart {chart_no}: Relationship between `{x_col}` and `{y_col}`")
-        st.caption("Each point shows how these two number columns move together.")
-        fig = px.scatter(work_df, x=x_col, y=y_col)
-        show_chart_with_download(fig, f"AUTO_scatter_{x_col}_{y_col}")
-        chart_no += 1
+        title = f"Relationship between `{x_col}` and `{y_col}`"
+        caption = "Each point shows how these two number columns move together."
+        with attempt(title):
+            fig = px.scatter(work_df, x=x_col, y=y_col)
+            add(title, caption, fig, f"AUTO_scatter_{x_col}_{y_col}")
 
     # ---------- Chart 7: Bubble Chart ----------
     if len(num_cols) >= 3:
         x_col, y_col, size_col = num_cols[0], num_cols[1], num_cols[2]
-        st.write(f"#### Chart {chart_no}: Bubble chart using `{x_col}`, `{y_col}`, `{size_col}`")
-        st.caption("Bigger bubbles mean larger values in the size column.")
-        fig = px.scatter(work_df, x=x_col, y=y_col, size=size_col, size_max=40, opacity=0.8)
-        show_chart_with_download(fig, f"AUTO_bubble_{x_col}_{y_col}_{size_col}")
-        chart_no += 1
+        title = f"Bubble chart using `{x_col}`, `{y_col}`, `{size_col}`"
+        caption = "Bigger bubbles mean larger values in the size column."
+        with attempt(title):
+            fig = px.scatter(work_df, x=x_col, y=y_col, size=size_col, size_max=40, opacity=0.8)
+            add(title, caption, fig, f"AUTO_bubble_{x_col}_{y_col}_{size_col}")
 
     # ---------- Chart 8: Correlation Heatmap ----------
     if len(num_cols) >= 2:
-        st.write(f"#### Chart {chart_no}: Correlation heatmap")
-        st.caption("Shows which numeric columns are strongly related to each other.")
-        fig = heatmap_corr(work_df)
-        if fig:
-            show_chart_with_download(fig, "AUTO_heatmap")
-        chart_no += 1
+        title = "Correlation heatmap"
+        caption = "Shows which numeric columns are strongly related to each other."
+        with attempt(title):
+            fig = heatmap_corr(work_df, token=token)
+            if fig:
+                add(title, caption, fig, "AUTO_heatmap")
 
     # ---------- Chart 9: Scatter Matrix (Mini pair-plot) ----------
     if len(num_cols) >= 3:
-        st.write(f"#### Chart {chart_no}: Scatter matrix of numeric columns")
-        st.caption("Multiple scatter plots to compare all numeric columns together.")
-        fig = px.scatter_matrix(work_df[num_cols[:4]])
-        show_chart_with_download(fig, "AUTO_scatter_matrix")
-        chart_no += 1
+        title = "Scatter matrix of numeric columns"
+        caption = "Multiple scatter plots to compare all numeric columns together."
+        with attempt(title):
+            if len(work_df) > LARGE_ROWS:
+                # one 2D histogram per panel instead of every row in every panel
+                fig = density_scatter_matrix(work_df, num_cols[:4], token=token)
+            else:
+                fig = px.scatter_matrix(work_df[num_cols[:4]])
+            add(title, caption, fig, "AUTO_scatter_matrix")
 
     # ---------- Chart 10: Top 10 categories (Bar) ----------
     if cat_cols:
         cat = cat_cols[0]
-        st.write(f"#### Chart {chart_no}: Top 10 values in `{cat}`")
-        st.caption("Shows which categories appear most often.")
-        vc = work_df[cat].value_counts().head(10).reset_index()
-        vc.columns = [cat, "Count"]
-        fig = px.bar(vc, x=cat, y="Count")
-        show_chart_with_download(fig, f"AUTO_top10_{cat}")
-        chart_no += 1
+        title = f"Top 10 values in `{cat}`"
+        caption = "Shows which categories appear most often."
+        with attempt(title):
+            if ooc is not None:
+                vc = ooc.value_counts(cat, top_n=10, filters=filters)
+            else:
+                vc = work_df[cat].value_counts().head(10).reset_index()
+                vc.columns = [cat, "Count"]
+            fig = px.bar(vc, x=cat, y="Count")
+            add(title, caption, fig, f"AUTO_top10_{cat}")
 
     # ---------- Chart 11: Top 5 categories (Pie) ----------
     if cat_cols:
         cat = cat_cols[0]
-        st.write(f"#### Chart {chart_no}: Share of top 5 values in `{cat}`")
-        st.caption("Pie chart that shows the proportion of main categories.")
-        vc = work_df[cat].value_counts().head(5).reset_index()
-        vc.columns = [cat, "Count"]
-        fig = px.pie(vc, names=cat, values="Count", hole=0.3)
-        show_chart_with_download(fig, f"AUTO_pie_{cat}")
-        chart_no += 1
+        title = f"Share of top 5 values in `{cat}`"
+        caption = "Pie chart that shows the proportion of main categories."
+        with attempt(title):
+            if ooc is not None:
+                vc = ooc.value_counts(cat, top_n=5, filters=filters)
+            else:
+                vc = work_df[cat].value_counts().head(5).reset_index()
+                vc.columns = [cat, "Count"]
+            fig = px.pie(vc, names=cat, values="Count", hole=0.3)
+            add(title, caption, fig, f"AUTO_pie_{cat}")
 
     # ---------- Chart 12: Category-wise SUM ----------
     if cat_cols and num_cols:
         cat, num = cat_cols[0], num_cols[0]
-        st.write(f"#### Chart {chart_no}: Total `{num}` by `{cat}`")
-        st.caption("Shows which category contributes the highest total value.")
-        g = work_df.groupby(cat)[num].sum().reset_index()
-        fig = px.bar(g, x=cat, y=num)
-        show_chart_with_download(fig, f"AUTO_sum_{cat}_{num}")
-        chart_no += 1
+        title = f"Total `{num}` by `{cat}`"
+        caption = "Shows which category contributes the highest total value."
+        with attempt(title):
+            if ooc is not None:
+                g = ooc.group_agg(cat, num, "sum", filters=filters)
+            elif profile is not None:
+                g = profile.group_agg(full_df, cat, num, "sum")
+            else:
+                g = work_df.groupby(cat)[num].sum().reset_index()
+            fig = px.bar(g, x=cat, y=num)
+            add(title, caption, fig, f"AUTO_sum_{cat}_{num}")
 
     # ---------- Chart 13: Category-wise AVERAGE ----------
     if cat_cols and num_cols:
         cat, num = cat_cols[0], num_cols[0]
-        st.write(f"#### Chart {chart_no}: Average `{num}` by `{cat}`")
-        st.caption("Shows which category has higher or lower average value.")
-        g = work_df.groupby(cat)[num].mean().reset_index()
-        g.rename(columns={num: f"Avg_{num}"}, inplace=True)
-        fig = px.bar(g, x=cat, y=f"Avg_{num}")
-        show_chart_with_download(fig, f"AUTO_avg_{cat}_{num}")
-        chart_no += 1
+        title = f"Average `{num}` by `{cat}`"
+        caption = "Shows which category has higher or lower average value."
+        with attempt(title):
+            if ooc is not None:
+                g = ooc.group_agg(cat, num, "mean", filters=filters)
+            elif profile is not None:
+                g = profile.group_agg(full_df, cat, num, "mean")
+            else:
+                g = work_df.groupby(cat)[num].mean().reset_index()
+            g.rename(columns={num: f"Avg_{num}"}, inplace=True)
+            fig = px.bar(g, x=cat, y=f"Avg_{num}")
+            add(title, caption, fig, f"AUTO_avg_{cat}_{num}")
 
     # ---------- Chart 14: Stacked bar (2 categories) ----------
     if len(cat_cols) >= 2 and num_cols:
         cat1, cat2, num = cat_cols[0], cat_cols[1], num_cols[0]
-        st.write(f"#### Chart {chart_no}: Stacked bar of `{num}` by `{cat1}` and `{cat2}`")
-        st.caption("Shows how a second category is distributed inside each main category.")
-        fig = px.bar(work_df, x=cat1, y=num, color=cat2)
-        show_chart_with_download(fig, f"AUTO_stacked_{cat1}_{cat2}_{num}")
-        chart_no += 1
+        title = f"Stacked bar of `{num}` by `{cat1}` and `{cat2}`"
+        caption = "Shows how a second category is distributed inside each main category."
+        with attempt(title):
+            fig = px.bar(work_df, x=cat1, y=num, color=cat2)
+            add(title, caption, fig, f"AUTO_stacked_{cat1}_{cat2}_{num}")
 
     # ---------- Chart 15: Simple forecast line ----------
     if num_cols and "Auto_Index" in work_df.columns:
         num = num_cols[0]
-        st.write(f"#### Chart {chart_no}: Simple forecast of `{num}` (next few points)")
-        st.caption("Line with basic prediction based on the current pattern.")
-        # Use Auto_Index as x for forecast
-        fig = line_with_forecast(work_df, "Auto_Index", num, periods=10)
-        show_chart_with_download(fig, f"AUTO_forecast_{num}")
-        chart_no += 1
+        title = f"Simple forecast of `{num}` (next few points)"
+        caption = "Line with basic prediction based on the current pattern."
+        with attempt(title):
+            # Use Auto_Index as x for forecast
+            fig = line_with_forecast(work_df, "Auto_Index", num, periods=10)
+            add(title, caption, fig, f"AUTO_forecast_{num}")
+
+    return rows, desc, charts, errors
+
+
+def build_group_agg(work_df: pd.DataFrame, filters: list[tuple], ooc, profile, full_df: pd.DataFrame, group_col, value_col, agg_func):
+    """Group & Aggregate table + its bar chart."""
+    agg = None
+    if ooc is not None:
+        agg = ooc.group_agg(group_col, value_col, agg_func, filters=filters)
+    elif profile is not None:
+        # partials updated on append; None for median
+        agg = profile.group_agg(full_df, group_col, value_col, agg_func)
+    if agg is None:
+        agg = get_backend().group_agg(work_df, group_col, value_col, agg_func)
+    agg.columns = [group_col, f"{agg_func}_{value_col}"]
+    return agg, bar_chart(agg, x_col=group_col, y_col=f"{agg_func}_{value_col}")
+
+
+def build_pivot(job, work_df: pd.DataFrame, filters: list[tuple], ooc, row_col, col_col, val_col, aggfunc):
+    """Pivot table + its heatmap (background job)."""
+    job.report(0.1, "Aggregating")
+    if ooc is not None:
+        pv = ooc.pivot(row_col, col_col, val_col, aggfunc, filters=filters)
+    else:
+        pv = get_backend().pivot(
+            work_df,
+            index=row_col,
+            columns=col_col,
+            values=val_col,
+            aggfunc=aggfunc,
+        )
+    job.report(0.7, "Drawing heatmap")
+    fig = px.imshow(
+        pv,
+        aspect="auto",
+        text_auto=True,
+        color_continuous_scale="Blues",
+        origin="lower",
+    )
+    fig.update_layout(transition_duration=500)
+    return pv, fig
+
+
+def build_animated(job, sub: str, work_df: pd.DataFrame, x_col, y_col, frame_col, size_col=None, color_col=None):
+    """Animated bar / scatter / bar race figure (background job)."""
+    job.report(0.1, "Building frames")
+    if sub == "Animated Bar":
+        return animated_bar_chart(work_df, x_col, y_col, frame_col), "adv_animated_bar"
+    if sub == "Bar Race":
+        return bar_race_chart(work_df, x_col, y_col, frame_col), "adv_bar_race"
+    fig = animated_scatter_chart(
+        work_df,
+        x_col,
+        y_col,
+        frame_col,
+        size_col=size_col,
+        color_col=color_col,
+    )
+    return fig, "adv_animated_scatter"
+
+
+def build_batch_forecast(job, work_df: pd.DataFrame, x_col, y_cols, group_col, periods, model, token):
+    """Batch forecast table + small-multiples figure (background job)."""
+    job.report(0.1, "Fitting every series")
+    table, plot_df = batch_forecast(work_df, x_col, y_cols, group_col, periods=periods, model=model, token=token)
+    job.report(0.8, "Drawing panels")
+    return table, None if table.empty else forecast_small_multiples(plot_df)
+
+
+# ================== PAGE START ==================
+
+load_css()
+
+st.markdown("<h1 class='page-title slide-in'>📈 Smart Analytics & Charts</h1>", unsafe_allow_html=True)
+st.caption("Upload • Analyze • Visualize – A fast business insights platform")
+
+df = load_dataset(st.session_state)
+if df is None:
+    st.warning("⚠️ No dataset found. Please upload a file in the **Home** page first.")
+    st.stop()
+
+# out-of-core dataset (DuckDB) – df is then only a row sample of it
+ooc = st.session_state.get("ooc")
+
+numeric_cols = df.select_dtypes(include="number").columns.tolist()
+all_cols = df.columns.tolist()
+cat_cols = [c for c in all_cols if c not in numeric_cols]
+
+if not all_cols:
+    st.error("Dataset has no columns.")
+    st.stop()
+
+if ooc is not None:
+    st.info(
+        f"📦 Out-of-core mode: tables and aggregates use all {ooc.num_rows:,} rows (DuckDB). "
+        f"Row-level charts use a {len(df):,}-row sample."
+    )
+
+st.markdown("<div class='glass-card animated-float'>", unsafe_allow_html=True)
+
+# ============= STEP 1 – Select Mode (Simple) =============
+
+mode = st.radio(
+    "🧠 What do you want to do?",
+    [
+        "⭐ Auto Analysis (recommended)",
+        "📊 Simple Chart",
+        "📌 Group & Aggregate (sum / mean / count)",
+        "📈 Pivot Table (rows × columns × values)",
+        "🎞 Advanced / Animated Charts",
+    ],
+    horizontal=False,
+)
+
+# =========================================================
+# MODE 1 – AUTO ANALYSIS (Beginner friendly, 1-click)
+# =========================================================
+if mode.startswith("⭐ Auto Analysis"):
+    st.subheader("⭐ Auto Analysis – important insights in one click")
 
+    filters = filter_panel(df)
+    work_df = apply_filters(df, filters)
 
+    key = ("auto", dataset_token(st.session_state), tuple(filters))
+    ensure_job(
+        "auto", "Auto Analysis", cached_job,
+        ("auto", dataset_hash(st.session_state, df), tuple(filters)), build_auto_analysis,
+        work_df, filters, ooc, profile_for(filters), df, data_token(filters), key=key,
+    )
+    result = job_result("auto", key)
+
+    if result is not None:
+        rows, desc, charts, errors = result
+
+        # ---------- Basic summary (table, not a chart) ----------
+        st.write("### 1) Basic summary of your data")
+        st.write(f"Rows: {rows} | Columns: {work_df.shape[1]}")
+        st.dataframe(desc)
+
+        st.write("---")
+        st.write("### 2) Auto generated charts (simple to read)")
+        for chart_no, (title, caption, fig, name) in enumerate(charts, start=1):
+            st.write(f"#### Chart {chart_no}: {title}")
+            st.caption(caption)
+            show_chart_with_download(fig, name)
+        for title, error in errors:
+            st.warning(f"⚠️ Skipped chart \"{title}\": {error}")
 
 
 # =========================================================
@@ -324,7 +428,8 @@ if mode.startswith("⭐ Auto Analysis"):
 elif mode.startswith("📊 Simple Chart"):
     st.subheader("📊 Simple Chart Builder (any chart in 3 clicks)")
 
-    work_df = apply_filters(df.copy())
+    filters = filter_panel(df)
+    work_df = apply_filters(df, filters)
 
     chart_kind = st.selectbox(
         "Choose chart type",
@@ -377,14 +482,15 @@ elif mode.startswith("📊 Simple Chart"):
 elif mode.startswith("📌 Group & Aggregate"):
     st.subheader("📌 Group & Aggregate – age-wise / gender-wise / city-wise etc.")
 
-    work_df = apply_filters(df.copy())
+    filters = filter_panel(df)
+    work_df = apply_filters(df, filters)
 
     group_col = st.selectbox("Group by (category column)", all_cols)
     if not numeric_cols:
         st.error("At least one numeric column needed for aggregation.")
     else:
         value_col = st.selectbox("Numeric column", numeric_cols)
-        agg_func = st.selectbox("Aggregation", ["sum", "mean", "count", "min", "max", "median"])
+        agg_func = st.selectbox("Aggregation", AGG_FUNCS)
 
         if st.button("Run Group & Aggregate"):
             # pandas groupby + agg
@@ -392,15 +498,17 @@ elif mode.startswith("📌 Group & Aggregate"):
                 f"df.groupby('{group_col}')['{value_col}'].agg('{agg_func}')",
                 language="python"
             )
-            agg = work_df.groupby(group_col)[value_col].agg(agg_func).reset_index()
-            agg.columns = [group_col, f"{agg_func}_{value_col}"]
+            # same columns + settings in another session (or before an append) -> its result is reused
+            agg, fig = cached(
+                result_key("group", filters, [group_col, value_col], group_col, value_col, agg_func),
+                build_group_agg, work_df, filters, ooc, profile_for(filters), df, group_col, value_col, agg_func,
+            )
 
             st.write("📋 Result of groupby + agg")
             st.dataframe(agg)
 
             # chart
             st.write("📊 Chart")
-            fig = bar_chart(agg, x_col=group_col, y_col=f"{agg_func}_{value_col}")
             show_chart_with_download(fig, "group_agg_chart")
 
 # =========================================================
@@ -409,7 +517,8 @@ elif mode.startswith("📌 Group & Aggregate"):
 elif mode.startswith("📈 Pivot Table"):
     st.subheader("📈 Pivot Table – rows × columns × values")
 
-    work_df = apply_filters(df.copy())
+    filters = filter_panel(df)
+    work_df = apply_filters(df, filters)
 
     if not numeric_cols:
         st.error("Need at least one numeric column for pivot.")
@@ -417,34 +526,29 @@ elif mode.startswith("📈 Pivot Table"):
         row_col = st.selectbox("Rows (index)", all_cols, key="pv_row")
         col_col = st.selectbox("Columns", all_cols, key="pv_col")
         val_col = st.selectbox("Values (numeric)", numeric_cols, key="pv_val")
-        aggfunc = st.selectbox("Aggregation", ["sum", "mean", "count", "min", "max", "median"])
+        aggfunc = st.selectbox("Aggregation", AGG_FUNCS)
+
+        key = ("pivot", dataset_token(st.session_state), tuple(filters), row_col, col_col, val_col, aggfunc)
+        if st.button("Generate Pivot Table") or retry_requested("pivot"):
+            submit_job(
+                "pivot", "Pivot Table", cached_job,
+                result_key("pivot", filters, [row_col, col_col, val_col], row_col, col_col, val_col, aggfunc),
+                build_pivot, work_df, filters, ooc, row_col, col_col, val_col, aggfunc, key=key,
+            )
+        result = job_result("pivot", key)
 
-        if st.button("Generate Pivot Table"):
+        if result is not None:
+            pv, fig = result
             st.code(
                 f"pd.pivot_table(df, index='{row_col}', columns='{col_col}', "
                 f"values='{val_col}', aggfunc='{aggfunc}')",
                 language="python",
             )
-            pv = pd.pivot_table(
-                work_df,
-                index=row_col,
-                columns=col_col,
-                values=val_col,
-                aggfunc=aggfunc,
-            )
             st.write("📋 Pivot result")
             st.dataframe(pv)
 
             # heatmap chart
             st.write("📊 Pivot Heatmap")
-            fig = px.imshow(
-                pv,
-                aspect="auto",
-                text_auto=True,
-                color_continuous_scale="Blues",
-                origin="lower",
-            )
-            fig.update_layout(transition_duration=500)
             show_chart_with_download(fig, "pivot_heatmap")
 
 # =========================================================
@@ -453,7 +557,8 @@ elif mode.startswith("📈 Pivot Table"):
 elif mode.startswith("🎞 Advanced"):
     st.subheader("🎞 Advanced & Animated Charts")
 
-    work_df = apply_filters(df.copy())
+    filters = filter_panel(df)
+    work_df = apply_filters(df, filters)
 
     sub = st.selectbox(
         "Select advanced chart type",
@@ -464,6 +569,7 @@ elif mode.startswith("🎞 Advanced"):
             "Animated Scatter",
             "Bar Race",
             "Line + Forecast",
+            "Batch Forecast (many series)",
         ],
     )
 
@@ -471,10 +577,27 @@ elif mode.startswith("🎞 Advanced"):
         if len(numeric_cols) < 2:
             st.error("Need at least 2 numeric columns.")
         else:
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                max_cols = st.number_input("Max columns in heatmap", 2, 200, 30, key="adv_corr_max")
+            with c2:
+                sample_rows = st.number_input("Row sample (0 = all rows)", 0, value=0, step=10000, key="adv_corr_sample")
+            with c3:
+                top_k = st.number_input("Top-K strongest pairs", 1, 500, 20, key="adv_corr_topk")
+            cluster = st.checkbox("Group correlated columns together (clustered order)", value=True)
+
             if st.button("Generate Heatmap"):
-                fig = heatmap_corr(work_df)
+                sample = int(sample_rows) or None
+                profile = None if sample else profile_for(filters)
+                corr = profile.correlation() if profile is not None else None
+                token = data_token(filters)
+                fig = heatmap_corr(
+                    work_df, max_cols=int(max_cols), cluster=cluster, sample_rows=sample, corr=corr, token=token,
+                )
                 if fig:
                     show_chart_with_download(fig, "adv_heatmap")
+                st.write(f"🔗 Top {int(top_k)} strongest pairs")
+                st.dataframe(top_corr_pairs(work_df, k=int(top_k), sample_rows=sample, corr=corr, token=token))
 
     elif sub == "3D Scatter":
         if len(numeric_cols) < 3:
@@ -492,16 +615,29 @@ elif mode.startswith("🎞 Advanced"):
                     key="adv3_z",
                 )
             color_col = st.selectbox("Color by (optional)", [None] + all_cols)
+            if len(work_df) > LARGE_ROWS:
+                st.caption(
+                    f"{len(work_df):,} rows – points are grouped into a 3D grid; "
+                    "marker size shows how many rows fall in each cell."
+                )
 
             if st.button("Generate 3D Scatter"):
-                fig = scatter_3d_chart(work_df, x_col, y_col, z_col, color_col)
+                fig = scatter_3d_chart(work_df, x_col, y_col, z_col, color_col, token=data_token(filters))
                 show_chart_with_download(fig, "adv_3d_scatter")
 
     elif sub in ["Animated Bar", "Animated Scatter", "Bar Race"]:
         if len(numeric_cols) < 1 or len(all_cols) < 2:
             st.error("Need more columns for animated charts.")
         else:
-            frame_col = st.selectbox("Frame (time/step)", all_cols, key="adv_frame")
+            # date columns first; their timestamps are bucketed to fit the frame budget
+            date_cols = datetime_columns(df)
+            frame_col = st.selectbox(
+                "Frame (time/step)",
+                date_cols + [c for c in all_cols if c not in date_cols],
+                key="adv_frame",
+            )
+            if frame_col in date_cols:
+                st.caption(f"Dates are grouped per minute / hour / day / week to at most {MAX_FRAMES} frames.")
             c1, c2 = st.columns(2)
             with c1:
                 x_col = st.selectbox("X-axis", all_cols, key="adv_anim_x")
@@ -514,24 +650,19 @@ elif mode.startswith("🎞 Advanced"):
                 size_col = st.selectbox("Size by (optional numeric)", [None] + numeric_cols)
                 color_col = st.selectbox("Color by (optional)", [None] + all_cols)
 
-            if st.button("Generate Animated Chart"):
-                if sub == "Animated Bar":
-                    fig = animated_bar_chart(work_df, x_col, y_col, frame_col)
-                    name = "adv_animated_bar"
-                elif sub == "Bar Race":
-                    fig = bar_race_chart(work_df, x_col, y_col, frame_col)
-                    name = "adv_bar_race"
-                else:
-                    fig = animated_scatter_chart(
-                        work_df,
-                        x_col,
-                        y_col,
-                        frame_col,
-                        size_col=size_col,
-                        color_col=color_col,
-                    )
-                    name = "adv_animated_scatter"
+            key = (
+                "animated", dataset_token(st.session_state), tuple(filters),
+                sub, x_col, y_col, frame_col, size_col, color_col,
+            )
+            if st.button("Generate Animated Chart") or retry_requested("animated"):
+                submit_job(
+                    "animated", sub, build_animated,
+                    sub, work_df, x_col, y_col, frame_col, size_col, color_col, key=key,
+                )
+            result = job_result("animated", key)
 
+            if result is not None:
+                fig, name = result
                 show_chart_with_download(fig, name)
 
     elif sub == "Line + Forecast":
@@ -540,14 +671,68 @@ elif mode.startswith("🎞 Advanced"):
         else:
             c1, c2 = st.columns(2)
             with c1:
-                x_col = st.selectbox("X-axis (time/index)", all_cols, key="adv_for_x")
+                date_cols = datetime_columns(df)
+                x_col = st.selectbox(
+                    "X-axis (time/index)",
+                    date_cols + [c for c in all_cols if c not in date_cols],
+                    key="adv_for_x",
+                )
             with c2:
                 y_col = st.selectbox("Y-axis (numeric)", numeric_cols, key="adv_for_y")
 
             periods = st.slider("Future points (forecast length)", 3, 30, 10)
+            if x_col in date_cols:
+                st.caption(f"Over {MAX_POINTS:,} timestamps are averaged per minute / hour / day / week first.")
 
             if st.button("Generate Forecast Line"):
                 fig = line_with_forecast(work_df, x_col, y_col, periods=periods)
                 show_chart_with_download(fig, "adv_line_forecast")
 
+    elif sub == "Batch Forecast (many series)":
+        if not numeric_cols:
+            st.error("Need at least one numeric column.")
+        else:
+            c1, c2 = st.columns(2)
+            with c1:
+                x_col = st.selectbox("X-axis (time/index)", all_cols, key="adv_bf_x")
+            with c2:
+                group_col = st.selectbox(
+                    "One series per value of (optional)",
+                    [None] + [c for c in all_cols if c != x_col],
+                    key="adv_bf_group",
+                )
+            y_cols = st.multiselect(
+                "Value columns",
+                [c for c in numeric_cols if c not in (x_col, group_col)],
+                default=[c for c in numeric_cols if c not in (x_col, group_col)][:3],
+                key="adv_bf_y",
+            )
+            c3, c4 = st.columns(2)
+            with c3:
+                model = st.selectbox("Model", MODELS, key="adv_bf_model")
+            with c4:
+                periods = st.slider("Future points (forecast length)", 3, 30, 10, key="adv_bf_periods")
+
+            key = (
+                "batch_forecast", dataset_token(st.session_state), tuple(filters),
+                x_col, tuple(y_cols), group_col, periods, model,
+            )
+            if (st.button("Run Batch Forecast") or retry_requested("batch_forecast")) and y_cols:
+                submit_job(
+                    "batch_forecast", "Batch Forecast", build_batch_forecast,
+                    work_df, x_col, y_cols, group_col, periods, model, data_token(filters), key=key,
+                )
+            result = job_result("batch_forecast", key)
+
+            if result is not None:
+                table, fig = result
+                if table.empty:
+                    st.warning("No series with at least 2 points.")
+                else:
+                    st.write(f"📋 {len(table)} series forecast")
+                    st.dataframe(table)
+                    if len(table) > PLOT_SERIES:
+                        st.caption(f"Chart shows the first {PLOT_SERIES} series; the table has all of them.")
+                    show_chart_with_download(fig, "adv_batch_forecast")
+
 st.markdown("</div>", unsafe_allow_html=True)
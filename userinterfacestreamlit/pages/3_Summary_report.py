@@ -1,29 +1,39 @@
 import streamlit as st
-import os
 from utils.report import generate_pdf_report
 from utils.analysis import get_basic_info
+from utils.memory import dataset_token, load_dataset
+from utils.ui import job_result, load_css, retry_requested, submit_job
 
 st.set_page_config(page_title="Summary Report | Auto Data Explorer", layout="wide")
 
-def load_css():
-    css_files = ["assets/style.css", "assets/animation.css"]
-    for css in css_files:
-        if os.path.exists(css):
-            with open(css) as f:
-                st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+
+def build_pdf(job, df, summary_text: str, ooc=None) -> bytes:
+    """PDF bytes (background job); out-of-core stats cover the whole file, not the sample."""
+    rows = desc = None
+    if ooc is not None:
+        job.report(0.1, "Scanning the full file")
+        rows = ooc.num_rows
+        # same numeric table df.describe() gives (stats as rows)
+        numeric = [c for c in df.select_dtypes("number").columns if c in ooc.columns]
+        stats = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+        desc = ooc.describe().reindex(index=numeric, columns=stats).T.astype(float)
+    job.report(0.5, "Writing PDF")
+    return generate_pdf_report(df, summary_text, rows=rows, desc=desc).getvalue()
+
 
 load_css()
 
 st.markdown("<h1 class='page-title slide-in'>📑 Summary Report</h1>", unsafe_allow_html=True)
 
-if "df" not in st.session_state:
+df = load_dataset(st.session_state)
+if df is None:
     st.warning("⚠️ No dataset found. Please upload a file in the **Home** page first.")
     st.stop()
 
-df = st.session_state["df"]
 file_name = st.session_state.get("file_name", "Uploaded Dataset")
 
-info = get_basic_info(df)
+ooc = st.session_state.get("ooc")
+info = ooc.basic_info() if ooc is not None else get_basic_info(df)
 
 st.markdown("<div class='glass-card animated-float'>", unsafe_allow_html=True)
 st.write(f"### 🗂 File: **{file_name}**")
@@ -48,12 +58,16 @@ summary_text = st.text_area(
     height=200
 )
 
-if st.button("📄 Generate PDF Report"):
-    pdf_buffer = generate_pdf_report(df, summary_text)
+key = ("pdf", dataset_token(st.session_state), summary_text)
+if st.button("📄 Generate PDF Report") or retry_requested("pdf"):
+    submit_job("pdf", "PDF report", build_pdf, df, summary_text, ooc, key=key)
+pdf_bytes = job_result("pdf", key)
+
+if pdf_bytes is not None:
     st.success("✅ PDF report generated! Download below.")
     st.download_button(
         label="⬇️ Download Report",
-        data=pdf_buffer,
+        data=pdf_bytes,
         file_name="data_summary_report.pdf",
         mime="application/pdf"
     )
@@ -0,0 +1,62 @@
+"""
+Cold-start import cost of the app and of each page.
+
+Every entry runs in a fresh interpreter (like a new worker), executes only
+the top-level imports of that script and reports wall time plus which heavy
+libraries got loaded on the way.
+
+    python tools/startup_times.py            (run from userinterfacestreamlit/)
+"""
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["app.py"] + sorted(
+    os.path.join("pages", f) for f in os.listdir(os.path.join(ROOT, "pages")) if f.endswith(".py")
+)
+HEAVY = ["plotly.express", "reportlab", "polars", "duckdb", "pyarrow", "openpyxl"]
+REPEAT = 3
+
+_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+t = time.perf_counter()
+{imports}
+dt = time.perf_counter() - t
+print(dt, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def top_level_imports(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+def measure(code: str) -> tuple[float, str]:
+    best, heavy = None, ""
+    for _ in range(REPEAT):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        dt = float(out[0])
+        heavy = out[1] if len(out) > 1 else "-"
+        best = dt if best is None else min(best, dt)
+    return best, heavy
+
+
+def main():
+    base, _ = measure(_PROBE.format(root=ROOT, imports="import streamlit", heavy=HEAVY))
+    print(f"{'script':<34}{'imports (ms)':>14}{'beyond streamlit':>18}   heavy modules loaded")
+    for script in SCRIPTS:
+        imports = top_level_imports(os.path.join(ROOT, script))
+        dt, heavy = measure(_PROBE.format(root=ROOT, imports=imports, heavy=HEAVY))
+        print(f"{script:<34}{dt * 1000:>14.0f}{(dt - base) * 1000:>18.0f}   {heavy}")
+    print(f"\n(import streamlit alone: {base * 1000:.0f} ms, best of {REPEAT} cold runs)")
+
+
+if __name__ == "__main__":
+    main()
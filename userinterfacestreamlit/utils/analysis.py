@@ -1,5 +1,7 @@
 import pandas as pd
 
+from utils.backend import get_backend
+
 def get_basic_info(df: pd.DataFrame):
     info = {
         "rows": df.shape[0],
@@ -9,15 +11,13 @@ def get_basic_info(df: pd.DataFrame):
     return info
 
 def get_missing_values(df: pd.DataFrame):
-    return df.isnull().sum().to_frame("missing_count")
+    # column by column – df.isnull() would allocate a boolean copy of the whole frame
+    counts = [int(df[col].isna().sum()) for col in df.columns]
+    return pd.DataFrame({"missing_count": counts}, index=df.columns)
 
 def get_column_types(df: pd.DataFrame):
     return df.dtypes.to_frame("dtype")
 
 def get_descriptive_stats(df: pd.DataFrame):
-    # include='all' na sometimes warning, so safe try
-    try:
-        desc = df.describe(include="all").T
-    except Exception:
-        desc = df.describe().T
-    return desc
+    # pandas or polars, decided per deployment (ADE_COMPUTE_BACKEND)
+    return get_backend().describe(df)
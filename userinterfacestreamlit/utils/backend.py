@@ -0,0 +1,259 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.lazy import lazy_import
+
+# polars is optional – pandas is always the fallback (imported on first use)
+pl = lazy_import("polars")
+
+# ========== Backend selection ==========
+
+# Per-deployment switch: "auto" (polars if installed), "polars" or "pandas"
+BACKEND_ENV = "ADE_COMPUTE_BACKEND"
+
+AGG_FUNCS = ["sum", "mean", "count", "min", "max", "median"]
+FILTER_OPS = ["==", "!=", ">", "<", ">=", "<=", "contains"]
+
+_DESCRIBE_NUMERIC_INDEX = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def available_backends() -> list[str]:
+    names = ["pandas"]
+    if pl is not None:
+        names.append("polars")
+    return names
+
+
+def get_backend_name() -> str:
+    wanted = os.environ.get(BACKEND_ENV, "auto").strip().lower()
+    if wanted in ("auto", "polars") and pl is not None:
+        return "polars"
+    return "pandas"
+
+
+@lru_cache(maxsize=None)
+def _backend_for(name: str):
+    if name == "polars":
+        return PolarsBackend()
+    return PandasBackend()
+
+
+def get_backend():
+    """Backend chosen for this deployment (see ADE_COMPUTE_BACKEND)."""
+    return _backend_for(get_backend_name())
+
+
+def apply_filters(df: pd.DataFrame, filters: list[tuple]) -> pd.DataFrame:
+    """Apply (column, operator, value) filters one by one; a bad filter is ignored."""
+    backend = get_backend()
+    for col, op, val in filters:
+        try:
+            df = backend.filter_rows(df, col, op, val)
+        except Exception:
+            pass
+    return df
+
+
+# ========== pandas (reference implementation) ==========
+
+class PandasBackend:
+    name = "pandas"
+
+    def filter_rows(self, df: pd.DataFrame, col: str, op: str, val) -> pd.DataFrame:
+        s = df[col]
+        if op == "==":
+            return df.loc[s == val]
+        if op == "!=":
+            return df.loc[s != val]
+        if op == ">":
+            return df.loc[s > val]
+        if op == "<":
+            return df.loc[s < val]
+        if op == ">=":
+            return df.loc[s >= val]
+        if op == "<=":
+            return df.loc[s <= val]
+        if op == "contains":
+            return df.loc[s.astype(str).str.contains(str(val), case=False, na=False)]
+        return df
+
+    def group_agg(self, df: pd.DataFrame, group_col: str, value_col: str, agg_func: str) -> pd.DataFrame:
+        return df.groupby(group_col)[value_col].agg(agg_func).reset_index()
+
+    def pivot(self, df: pd.DataFrame, index: str, columns: str, values: str, aggfunc: str) -> pd.DataFrame:
+        return pd.pivot_table(df, index=index, columns=columns, values=values, aggfunc=aggfunc)
+
+    def describe(self, df: pd.DataFrame) -> pd.DataFrame:
+        # include='all' na sometimes warning, so safe try
+        try:
+            return df.describe(include="all").T
+        except Exception:
+            return df.describe().T
+
+
+# ========== polars (multi-threaded, columnar) ==========
+
+def _is_numeric(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+def _to_polars(df: pd.DataFrame, cols: list[str]):
+    # only the needed columns are converted, not the whole frame
+    return pl.from_pandas(df[list(dict.fromkeys(cols))])
+
+
+def _series_to_numpy(s) -> np.ndarray:
+    if s.dtype.is_numeric() and s.null_count():
+        return s.cast(pl.Float64).fill_null(np.nan).to_numpy()
+    return s.to_numpy()
+
+
+def _polars_agg_expr(value_col: str, agg_func: str):
+    col = pl.col(value_col)
+    exprs = {
+        "sum": col.sum(),
+        "mean": col.mean(),
+        "count": col.count().cast(pl.Int64),
+        "min": col.min(),
+        "max": col.max(),
+        "median": col.median(),
+    }
+    return exprs[agg_func].alias(value_col)
+
+
+def _reorder_describe_index(indexes: list[list[str]]) -> list[str]:
+    # same row order as pandas describe(include="all")
+    names, seen = [], set()
+    for idx in sorted(indexes, key=len):
+        for name in idx:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+
+def assemble_describe(ldesc: list[pd.Series], columns: pd.Index) -> pd.DataFrame:
+    """Per-column describe() Series -> the transposed describe(include="all") table."""
+    names = _reorder_describe_index([list(s.index) for s in ldesc])
+    desc = pd.concat([s.reindex(names) for s in ldesc], axis=1, sort=False)
+    desc.columns = columns.copy()
+    return desc.T
+
+
+def pivot_from_groups(agged: pd.DataFrame, index: str, columns: str, values: str) -> pd.DataFrame:
+    """(index, columns, value) group rows -> same table as pd.pivot_table."""
+    # pivot_table = groupby + unstack, then all-NaN rows / columns dropped
+    table = (
+        agged.dropna(subset=[values])
+        .set_index([index, columns])[values]
+        .unstack(columns)
+        .sort_index()
+        .sort_index(axis=1)
+    )
+    return table.dropna(how="all", axis=1)
+
+
+class PolarsBackend(PandasBackend):
+    """
+    Runs filters, group-by, pivot and describe on polars.
+    Any column polars cannot take (mixed objects, categoricals, ...) -> pandas.
+    Output tables are shaped exactly like the pandas ones.
+    """
+    name = "polars"
+
+    def filter_rows(self, df: pd.DataFrame, col: str, op: str, val) -> pd.DataFrame:
+        # datetime / bool / category comparisons keep pandas semantics
+        if not (_is_numeric(df[col]) or pd.api.types.is_string_dtype(df[col])):
+            return super().filter_rows(df, col, op, val)
+        try:
+            s = _to_polars(df, [col]).get_column(col)
+        except Exception:
+            return super().filter_rows(df, col, op, val)
+
+        if op == "contains":
+            # missing values never match (pandas na=False)
+            mask = s.cast(pl.Utf8).str.contains("(?i)" + str(val)).fill_null(False)
+        elif op in ("==", "!=", ">", "<", ">=", "<="):
+            mask = {
+                "==": lambda: s == val,
+                "!=": lambda: s != val,
+                ">": lambda: s > val,
+                "<": lambda: s < val,
+                ">=": lambda: s >= val,
+                "<=": lambda: s <= val,
+            }[op]()
+            # pandas: NaN compares False, except "!=" which is True
+            mask = mask.fill_null(op == "!=")
+        else:
+            return df
+        return df.loc[mask.to_numpy()]
+
+    def group_agg(self, df: pd.DataFrame, group_col: str, value_col: str, agg_func: str) -> pd.DataFrame:
+        if group_col == value_col or isinstance(df[group_col].dtype, pd.CategoricalDtype):
+            return super().group_agg(df, group_col, value_col, agg_func)
+        try:
+            res = (
+                _to_polars(df, [group_col, value_col])
+                .filter(pl.col(group_col).is_not_null())
+                .group_by(group_col)
+                .agg(_polars_agg_expr(value_col, agg_func))
+                .sort(group_col)
+            )
+        except Exception:
+            return super().group_agg(df, group_col, value_col, agg_func)
+        return pd.DataFrame({c: _series_to_numpy(res.get_column(c)) for c in res.columns})
+
+    def pivot(self, df: pd.DataFrame, index: str, columns: str, values: str, aggfunc: str) -> pd.DataFrame:
+        if len({index, columns, values}) < 3 or any(
+            isinstance(df[c].dtype, pd.CategoricalDtype) for c in (index, columns)
+        ):
+            return super().pivot(df, index, columns, values, aggfunc)
+        try:
+            res = (
+                _to_polars(df, [index, columns, values])
+                .filter(pl.col(index).is_not_null() & pl.col(columns).is_not_null())
+                .group_by([index, columns])
+                .agg(_polars_agg_expr(values, aggfunc))
+            )
+        except Exception:
+            return super().pivot(df, index, columns, values, aggfunc)
+
+        agged = pd.DataFrame({c: _series_to_numpy(res.get_column(c)) for c in res.columns})
+        return pivot_from_groups(agged, index, columns, values)
+
+    def describe(self, df: pd.DataFrame) -> pd.DataFrame:
+        num_cols = [c for c in df.columns if _is_numeric(df[c])]
+        if df.columns.has_duplicates or not num_cols:
+            return super().describe(df)
+        try:
+            exprs = []
+            for i, c in enumerate(num_cols):
+                col = pl.col(c).cast(pl.Float64)
+                exprs += [
+                    col.count().alias(f"{i}_count"),
+                    col.mean().alias(f"{i}_mean"),
+                    col.std().alias(f"{i}_std"),
+                    col.min().alias(f"{i}_min"),
+                    col.quantile(0.25, "linear").alias(f"{i}_25%"),
+                    col.quantile(0.5, "linear").alias(f"{i}_50%"),
+                    col.quantile(0.75, "linear").alias(f"{i}_75%"),
+                    col.max().alias(f"{i}_max"),
+                ]
+            row = _to_polars(df, num_cols).select(exprs).row(0, named=True)
+        except Exception:
+            return super().describe(df)
+
+        ldesc = []
+        for c in df.columns:
+            if c in num_cols:
+                i = num_cols.index(c)
+                vals = [row[f"{i}_{stat}"] for stat in _DESCRIBE_NUMERIC_INDEX]
+                vals = [np.nan if v is None else float(v) for v in vals]
+                ldesc.append(pd.Series(vals, index=_DESCRIBE_NUMERIC_INDEX, name=c))
+            else:
+                ldesc.append(df[c].describe())
+
+        return assemble_describe(ldesc, df.columns)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from utils.fingerprint import frame_fingerprint
+from utils.memory import governor
+
+# ========== Settings ==========
+
+# above this many rows the 3D scatter / scatter matrix switch to binned views
+LARGE_ROWS = 100_000
+VOXEL_BINS = 20           # per axis -> at most 8,000 voxels
+MATRIX_BINS = 40          # per axis in each scatter-matrix panel
+MATRIX_SAMPLE = 200_000   # one row sample shared by every panel
+MAX_COLOR_GROUPS = 10     # categorical colour: top values, the rest -> "Other"
+
+
+# ========== Vectorized binning ==========
+
+def bin_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    """`bins` equal-width intervals over the finite values (one unit wide if constant)."""
+    finite = values[np.isfinite(values)]
+    lo, hi = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+    if hi <= lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def bin_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Bin number of every value (max value -> last bin, NaN -> -1)."""
+    bins = len(edges) - 1
+    scaled = (values - edges[0]) / (edges[-1] - edges[0]) * bins
+    idx = np.clip(np.nan_to_num(scaled, nan=-1.0), -1, bins - 1).astype(np.intp)
+    idx[~np.isfinite(values)] = -1
+    return idx
+
+
+def _floats(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype=float, na_value=np.nan)
+
+
+# ========== 3D voxels ==========
+
+def voxel_bins(
+    df: pd.DataFrame,
+    x_col: str,
+    y_col: str,
+    z_col: str,
+    color_col: str | None = None,
+    bins: int = VOXEL_BINS,
+    token=None,
+) -> pd.DataFrame:
+    """
+    Points aggregated into a bins³ grid: one row per non-empty voxel
+    (per colour group for a categorical colour) with the mean position,
+    the point count and – for a numeric colour – its mean.
+    Cached per data + column set (`token` as in correlation_matrix).
+    """
+    cols = list(dict.fromkeys([x_col, y_col, z_col] + ([color_col] if color_col else [])))
+    data = token if token is not None else frame_fingerprint(df[cols])
+    key = ("voxels", data, x_col, y_col, z_col, color_col, bins)
+    cached = governor.get(key)
+    if cached is not None:
+        return cached
+
+    xyz = [_floats(df, c) for c in (x_col, y_col, z_col)]
+    idx = [bin_index(v, bin_edges(v, bins)) for v in xyz]
+    valid = (idx[0] >= 0) & (idx[1] >= 0) & (idx[2] >= 0)
+    flat = (idx[0] * bins + idx[1]) * bins + idx[2]
+
+    groups, labels, color_mean = 1, None, None
+    if color_col is not None:
+        c = df[color_col]
+        if pd.api.types.is_numeric_dtype(c) and not pd.api.types.is_bool_dtype(c):
+            color_mean = c.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            top = c.value_counts().index[:MAX_COLOR_GROUPS]
+            c = c.where(c.isin(top) | c.isna(), "Other")
+            codes, labels = pd.factorize(c, sort=True)
+            valid &= codes >= 0
+            groups = len(labels)
+            flat = flat * groups + codes
+
+    flat = flat[valid]
+    size = bins ** 3 * groups
+    count = np.bincount(flat, minlength=size)
+    used = np.flatnonzero(count)
+    out = {}
+    for col, v in zip((x_col, y_col, z_col), xyz):
+        out[col] = np.bincount(flat, weights=v[valid], minlength=size)[used] / count[used]
+    if color_mean is not None:
+        cv = color_mean[valid]
+        present = ~np.isnan(cv)
+        n_c = np.bincount(flat[present], minlength=size)[used]
+        s_c = np.bincount(flat[present], weights=cv[present], minlength=size)[used]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[color_col] = np.where(n_c > 0, s_c / np.maximum(n_c, 1), np.nan)
+    elif labels is not None:
+        out[color_col] = np.asarray(labels, dtype=object)[used % groups]
+    out["count"] = count[used]
+
+    return governor.put(key, pd.DataFrame(out), kind="stats")
+
+
+# ========== Scatter-matrix density ==========
+
+def density_matrix(
+    df: pd.DataFrame,
+    cols: list[str],
+    bins: int = MATRIX_BINS,
+    sample_rows: int = MATRIX_SAMPLE,
+    seed: int = 0,
+    token=None,
+) -> dict:
+    """
+    2D histograms of every column pair (and 1D ones on the diagonal),
+    all from one shared row sample. Returns {"cols", "edges": {col: edges},
+    "counts": {(i, j): array}, "rows": sampled rows}. Cached per data + column set.
+    """
+    cols = list(cols)
+    data = token if token is not None else frame_fingerprint(df[cols])
+    key = ("density_matrix", data, tuple(cols), bins, sample_rows, seed)
+    cached = governor.get(key)
+    if cached is not None:
+        return cached
+
+    rows = None
+    if len(df) > sample_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(len(df), size=sample_rows, replace=False))
+    values = {c: _floats(df, c) if rows is None else _floats(df, c)[rows] for c in cols}
+    edges = {c: bin_edges(v, bins) for c, v in values.items()}
+    idx = {c: bin_index(values[c], edges[c]) for c in cols}
+
+    counts = {}
+    for i, ci in enumerate(cols):
+        counts[(i, i)] = np.bincount(idx[ci][idx[ci] >= 0], minlength=bins)
+        for j in range(i + 1, len(cols)):
+            cj = cols[j]
+            ok = (idx[ci] >= 0) & (idx[cj] >= 0)
+            grid = np.bincount(idx[ci][ok] * bins + idx[cj][ok], minlength=bins * bins).reshape(bins, bins)
+            counts[(i, j)] = grid        # rows = ci bins, cols = cj bins
+            counts[(j, i)] = grid.T
+
+    result = {"cols": cols, "edges": edges, "counts": counts, "rows": len(df) if rows is None else len(rows)}
+    return governor.put(key, result, kind="stats")
@@ -0,0 +1,118 @@
+import itertools
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from utils.backend import apply_filters
+from utils.memory import governor
+
+# ========== Settings ==========
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+# one token per live frame; its sort orders / filter results sit in the
+# memory governor under ("browse", token, ...) and are dropped with the frame
+_FRAMES: dict[int, tuple] = {}
+_FRAMES_LOCK = threading.Lock()
+_TOKENS = itertools.count()
+
+
+def _forget(key: int, token: int):
+    _FRAMES.pop(key, None)
+    governor.discard_prefix(("browse", token))
+
+
+def _token(df: pd.DataFrame) -> int:
+    key = id(df)
+    with _FRAMES_LOCK:
+        found = _FRAMES.get(key)
+        if found is None or found[0]() is not df or found[1] != len(df):
+            if found is not None:
+                governor.discard_prefix(("browse", found[2]))
+            token = next(_TOKENS)
+            ref = weakref.ref(df, lambda _, key=key, token=token: _forget(key, token))
+            found = (ref, len(df), token)
+            _FRAMES[key] = found
+        return found[2]
+
+
+# ========== Sorting (cached argsort per column) ==========
+
+def sort_order(df: pd.DataFrame, col: str, ascending: bool = True) -> np.ndarray:
+    """Row positions sorted by `col` (missing values last). Computed once per column."""
+    token = _token(df)
+    order = governor.get(("browse", token, "order", col, ascending))
+    if order is not None:
+        return order
+    asc = governor.get(("browse", token, "order", col, True))
+    s = df[col]
+    if asc is None:
+        s = s.reset_index(drop=True)
+        try:
+            asc = s.sort_values(kind="stable", na_position="last").index.to_numpy()
+        except TypeError:
+            # mixed types in one object column – sort by their text
+            asc = s.astype(str).where(s.notna()).sort_values(kind="stable", na_position="last").index.to_numpy()
+        governor.put(("browse", token, "order", col, True), asc, kind="derived")
+    if ascending:
+        return asc
+    valid = int(s.notna().sum())
+    desc = np.concatenate([asc[:valid][::-1], asc[valid:]])
+    return governor.put(("browse", token, "order", col, False), desc, kind="derived")
+
+
+# ========== Filtering (same filter specs as the chart page) ==========
+
+def filter_positions(df: pd.DataFrame, filters: list[tuple]) -> np.ndarray | None:
+    """Positions of rows kept by `filters` (None = no filter, every row)."""
+    if not filters:
+        return None
+    key = ("browse", _token(df), "filter", tuple(filters))
+    kept = governor.get(key)
+    if kept is None:
+        # only the filter columns, with a positional index, go through the filters
+        cols = list(dict.fromkeys(f[0] for f in filters if f[0] in df.columns))
+        slim = df[cols].set_axis(pd.RangeIndex(len(df)), axis=0)
+        kept = governor.put(key, apply_filters(slim, filters).index.to_numpy(), kind="derived")
+    return kept
+
+
+def row_count(df: pd.DataFrame, filters: list[tuple] | None = None) -> int:
+    kept = filter_positions(df, filters or [])
+    return len(df) if kept is None else len(kept)
+
+
+# ========== One page ==========
+
+def browse_page(
+    df: pd.DataFrame,
+    page: int,
+    page_size: int,
+    sort_col: str | None = None,
+    ascending: bool = True,
+    filters: list[tuple] | None = None,
+) -> pd.DataFrame:
+    """
+    Rows of page `page` (0-based) after filtering and sorting.
+    Only `page_size` rows are ever copied, whatever the frame size.
+    """
+    kept = filter_positions(df, filters or [])
+    start = page * page_size
+    if sort_col is None:
+        if kept is None:
+            return df.iloc[start:start + page_size]
+        positions = kept
+    elif kept is None:
+        positions = sort_order(df, sort_col, ascending)
+    else:
+        key = ("browse", _token(df), "view", tuple(filters), sort_col, ascending)
+        positions = governor.get(key)
+        if positions is None:
+            # sorted order restricted to the kept rows; kept per filter + sort
+            mask = np.zeros(len(df), dtype=bool)
+            mask[kept] = True
+            order = sort_order(df, sort_col, ascending)
+            positions = governor.put(key, order[mask[order]], kind="derived")
+    return df.iloc[positions[start:start + page_size]]
@@ -1,7 +1,17 @@
-import plotly.express as px
 import pandas as pd
 import numpy as np
 
+from utils.binning import LARGE_ROWS, density_matrix, voxel_bins
+from utils.forecast import future_axis, numeric_axis
+from utils.correlation import TEXT_MAX_COLS, correlation_matrix, heatmap_matrix, top_pairs
+from utils.lazy import LazyModule
+from utils.timeseries import resample_for_line, resample_frames
+
+# plotly is imported on the first chart, not at page start
+px = LazyModule("plotly.express")
+go = LazyModule("plotly.graph_objects")
+subplots = LazyModule("plotly.subplots")
+
 # ========== Basic Charts ==========
 
 def bar_chart(df: pd.DataFrame, x_col: str, y_col: str):
@@ -9,10 +19,17 @@ def bar_chart(df: pd.DataFrame, x_col: str, y_col: str):
     fig.update_layout(transition_duration=500)
     return fig
 
+def _per(gran: str | None) -> str:
+    return "" if gran is None else f" (mean per {gran})"
+
 def line_chart(df: pd.DataFrame, x_col: str, y_col: str):
+    # date x-axis: too many timestamps -> mean per minute / hour / day / week
+    df, gran = resample_for_line(df, x_col, [y_col])
     fig = px.line(df, x=x_col, y=y_col)
     fig.update_traces(mode="lines+markers")
     fig.update_layout(transition_duration=500)
+    if gran is not None:
+        fig.update_layout(title=f"{y_col}{_per(gran)}")
     return fig
 
 def scatter_chart(df: pd.DataFrame, x_col: str, y_col: str, color_col: str | None = None):
@@ -26,29 +43,73 @@ def pie_chart(df: pd.DataFrame, names_col: str, values_col: str):
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
+def histogram_from_bins(bins: pd.DataFrame, col: str):
+    """Histogram from pre-aggregated bins (bin_start, bin_end, count) – e.g. out-of-core SQL."""
+    centers = (bins["bin_start"] + bins["bin_end"]) / 2
+    fig = px.bar(x=centers, y=bins["count"], labels={"x": col, "y": "count"})
+    fig.update_traces(width=(bins["bin_end"] - bins["bin_start"]).tolist(), marker_line_width=0)
+    fig.update_layout(bargap=0, transition_duration=500)
+    return fig
+
 # ========== Advanced Charts ==========
 
-def heatmap_corr(df: pd.DataFrame):
+def heatmap_corr(
+    df: pd.DataFrame,
+    max_cols: int = 30,
+    cluster: bool = True,
+    sample_rows: int | None = None,
+    corr: pd.DataFrame | None = None,
+    token=None,
+):
+    """
+    Correlation heatmap that stays readable on wide data:
+    only the `max_cols` most correlated columns are drawn (clustered order).
+    `corr` = an already known matrix (e.g. kept up to date on append);
+    `token` identifies the data for the matrix cache (see correlation_matrix).
+    """
     num_df = df.select_dtypes(include="number")
     if num_df.shape[1] < 2:
         return None
 
-    corr = num_df.corr()
+    if corr is None:
+        corr = correlation_matrix(num_df, sample_rows=sample_rows, token=token)
+    shown = heatmap_matrix(corr, max_cols=max_cols, cluster=cluster)
     fig = px.imshow(
-        corr,
-        text_auto=True,
+        shown,
+        text_auto=".2f" if len(shown) <= TEXT_MAX_COLS else False,
         aspect="auto",
         zmin=-1,
         zmax=1,
         color_continuous_scale="RdBu"
     )
+    title = "Correlation Heatmap"
+    if len(shown) < len(corr):
+        title += f" (top {len(shown)} of {len(corr)} numeric columns)"
     fig.update_layout(
-        title="Correlation Heatmap",
+        title=title,
         transition_duration=500
     )
     return fig
 
-def scatter_3d_chart(df: pd.DataFrame, x_col: str, y_col: str, z_col: str, color_col: str | None = None):
+
+def top_corr_pairs(
+    df: pd.DataFrame,
+    k: int = 20,
+    sample_rows: int | None = None,
+    corr: pd.DataFrame | None = None,
+    token=None,
+) -> pd.DataFrame:
+    """Top-K strongest pairs – the list view for very wide data."""
+    num_df = df.select_dtypes(include="number")
+    if num_df.shape[1] < 2:
+        return pd.DataFrame({"column_1": [], "column_2": [], "corr": []})
+    if corr is None:
+        corr = correlation_matrix(num_df, sample_rows=sample_rows, token=token)
+    return top_pairs(corr, k)
+
+def scatter_3d_chart(df: pd.DataFrame, x_col: str, y_col: str, z_col: str, color_col: str | None = None, token=None):
+    if len(df) > LARGE_ROWS:
+        return scatter_3d_binned(df, x_col, y_col, z_col, color_col, token=token)
     fig = px.scatter_3d(df, x=x_col, y=y_col, z=z_col, color=color_col)
     fig.update_traces(marker=dict(size=5, opacity=0.8))
     fig.update_layout(
@@ -57,9 +118,83 @@ def scatter_3d_chart(df: pd.DataFrame, x_col: str, y_col: str, z_col: str, color
     )
     return fig
 
+def scatter_3d_binned(df: pd.DataFrame, x_col: str, y_col: str, z_col: str, color_col: str | None = None, token=None):
+    """3D scatter for large data: one marker per voxel, sized by its point count."""
+    vox = voxel_bins(df, x_col, y_col, z_col, color_col, token=token)
+    fig = px.scatter_3d(
+        vox,
+        x=x_col,
+        y=y_col,
+        z=z_col,
+        color=color_col,
+        size="count",
+        size_max=30,
+        hover_data=["count"],
+    )
+    fig.update_traces(marker=dict(opacity=0.7, line=dict(width=0)))
+    fig.update_layout(
+        title=f"3D Scatter – {int(vox['count'].sum()):,} points in {len(vox):,} voxels (size = count)",
+        transition_duration=600
+    )
+    return fig
+
+def density_scatter_matrix(df: pd.DataFrame, cols: list[str], token=None):
+    """
+    Scatter matrix for large data: each panel is a 2D histogram (colour =
+    rows per cell), histograms on the diagonal, all from one row sample.
+    """
+    dm = density_matrix(df, cols, token=token)
+    k = len(cols)
+    fig = subplots.make_subplots(rows=k, cols=k, shared_xaxes="columns", horizontal_spacing=0.02, vertical_spacing=0.02)
+    centers = {c: (e[:-1] + e[1:]) / 2 for c, e in dm["edges"].items()}
+    for i, ci in enumerate(cols):          # row = y column
+        for j, cj in enumerate(cols):      # col = x column
+            if i == j:
+                trace = go.Bar(x=centers[cj], y=dm["counts"][(j, j)], marker_line_width=0, showlegend=False)
+            else:
+                trace = go.Heatmap(
+                    x=centers[cj],
+                    y=centers[ci],
+                    z=dm["counts"][(i, j)],     # rows follow ci (y), columns cj (x)
+                    coloraxis="coloraxis",
+                    hovertemplate=f"{cj}=%{{x}}<br>{ci}=%{{y}}<br>rows=%{{z}}<extra></extra>",
+                )
+            fig.add_trace(trace, row=i + 1, col=j + 1)
+        fig.update_yaxes(title_text=ci, row=i + 1, col=1)
+        fig.update_xaxes(title_text=ci, row=k, col=i + 1)
+    fig.update_layout(
+        title=f"Scatter matrix (density of a {dm['rows']:,}-row sample)",
+        coloraxis=dict(colorscale="Viridis", colorbar=dict(title="rows")),
+        bargap=0,
+        height=max(400, 220 * k),
+        transition_duration=500,
+    )
+    return fig
+
+def missingness_matrix(buckets: pd.DataFrame, max_cols: int = 50):
+    """Share missing per row range x column (from NullBitmaps.by_row_bucket, not raw rows)."""
+    shown = buckets.loc[:, buckets.max() > 0]
+    if shown.shape[1] > max_cols:
+        shown = shown[shown.mean().nlargest(max_cols).index]
+    fig = px.imshow(
+        shown,
+        aspect="auto",
+        zmin=0,
+        zmax=1,
+        color_continuous_scale="Reds",
+        labels={"x": "column", "y": "rows", "color": "missing share"},
+    )
+    title = "Missingness matrix"
+    if shown.shape[1] < (buckets.max() > 0).sum():
+        title += f" ({shown.shape[1]} most-missing columns)"
+    fig.update_layout(title=title, transition_duration=500)
+    return fig
+
 # ========== Animated Charts ==========
 
 def animated_bar_chart(df: pd.DataFrame, x_col: str, y_col: str, frame_col: str):
+    # date frames: bucketed to at most MAX_FRAMES, y summed per frame + bar
+    df, _ = resample_frames(df, frame_col, x_col, y_col)
     fig = px.bar(
         df,
         x=x_col,
@@ -76,7 +211,8 @@ def animated_bar_chart(df: pd.DataFrame, x_col: str, y_col: str, frame_col: str)
     return fig
 
 def bar_race_chart(df: pd.DataFrame, x_col: str, y_col: str, frame_col: str):
-    # sort by frame + value for smooth race
+    df, _ = resample_frames(df, frame_col, x_col, y_col)
+    # sort by frame + value for smooth race (date frame labels sort in time order)
     df_sorted = df.sort_values(by=[frame_col, y_col])
     fig = px.bar(
         df_sorted,
@@ -101,6 +237,8 @@ def animated_scatter_chart(
     size_col: str | None = None,
     color_col: str | None = None,
 ):
+    # date frames: bucketed to at most MAX_FRAMES; every row stays a point
+    df, _ = resample_frames(df, frame_col, agg=None)
     fig = px.scatter(
         df,
         x=x_col,
@@ -120,12 +258,33 @@ def animated_scatter_chart(
 
 # ========== Simple Forecast (Line + Prediction) ==========
 
+def forecast_small_multiples(plot_df: pd.DataFrame, max_panels: int = 12, cols: int = 3):
+    """One small panel per series (history + forecast), from batch_forecast output."""
+    names = plot_df["series"].drop_duplicates().tolist()[:max_panels]
+    data = plot_df[plot_df["series"].isin(names)]
+    rows = -(-len(names) // cols)
+    fig = px.line(
+        data,
+        x="x",
+        y="y",
+        color="type",
+        facet_col="series",
+        facet_col_wrap=cols,
+        facet_row_spacing=min(0.08, 0.9 / max(rows, 1)),
+    )
+    fig.update_yaxes(matches=None, showticklabels=True)
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    fig.update_layout(height=max(300, 250 * rows), legend_title="Series", transition_duration=600)
+    return fig
+
 def line_with_forecast(df: pd.DataFrame, x_col: str, y_col: str, periods: int = 10):
     """
     Simple forecast using linear regression (numpy polyfit).
     Not hardcore ML, but interview ku explain panna easy.
     """
-    temp = df[[x_col, y_col]].dropna()
+    # date x-axis: too many timestamps -> mean per minute / hour / day / week
+    temp, gran = resample_for_line(df[[x_col, y_col]], x_col, [y_col])
+    temp = temp.dropna()
     if temp.empty:
         # fallback to normal line chart
         return line_chart(df, x_col, y_col)
@@ -133,11 +292,8 @@ def line_with_forecast(df: pd.DataFrame, x_col: str, y_col: str, periods: int =
     x = temp[x_col]
     y = temp[y_col].astype(float).values
 
-    # x numeric / datetime / others handle pannrom
-    if np.issubdtype(x.dtype, np.number):
-        x_idx = x.values.astype(float)
-    else:
-        x_idx = np.arange(len(x), dtype=float)
+    # x numeric / datetime (real time gaps) / others (row position) handle pannrom
+    x_idx = numeric_axis(x)
 
     # linear fit
     try:
@@ -145,19 +301,9 @@ def line_with_forecast(df: pd.DataFrame, x_col: str, y_col: str, periods: int =
     except Exception:
         return line_chart(df, x_col, y_col)
 
-    last_idx = x_idx[-1]
-    future_idx = np.arange(last_idx + 1, last_idx + periods + 1, dtype=float)
+    future_idx, future_x = future_axis(x, x_idx, periods)
     future_y = m * future_idx + b
 
-    # future x build
-    if np.issubdtype(x.dtype, np.number):
-        future_x = future_idx
-    elif np.issubdtype(x.dtype, np.datetime64):
-        step = (x.iloc[-1] - x.iloc[0]) / max(len(x) - 1, 1)
-        future_x = [x.iloc[-1] + step * (i + 1) for i in range(periods)]
-    else:
-        future_x = [f"{x_col}_t+{i+1}" for i in range(periods)]
-
     hist_df = pd.DataFrame({"x": x, "y": y, "type": "History"})
     fut_df = pd.DataFrame({"x": future_x, "y": future_y, "type": "Forecast"})
 
@@ -166,7 +312,7 @@ def line_with_forecast(df: pd.DataFrame, x_col: str, y_col: str, periods: int =
     fig = px.line(plot_df, x="x", y="y", color="type")
     fig.update_traces(mode="lines+markers")
     fig.update_layout(
-        title=f"{y_col} with simple forecast",
+        title=f"{y_col}{_per(gran)} with simple forecast",
         transition_duration=600,
         legend_title="Series"
     )
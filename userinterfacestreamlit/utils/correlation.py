@@ -0,0 +1,170 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.fingerprint import frame_fingerprint
+from utils.memory import governor
+
+# ========== Settings ==========
+
+BLOCK_COLS = 256          # columns per block in the blocked X^T X
+MAX_CELLS = 50_000_000    # rows x cols above this -> row sample (~200 MB float32)
+TEXT_MAX_COLS = 15        # numbers inside heatmap cells only when this small
+
+
+# ========== Engine ==========
+
+def _standardized(num_df: pd.DataFrame, sample_rows: int | None, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """float32 z-scores (NaN -> 0) + float32 presence mask (None if no NaN)."""
+    n = len(num_df)
+    if sample_rows is None and n * num_df.shape[1] > MAX_CELLS:
+        sample_rows = max(MAX_CELLS // max(num_df.shape[1], 1), 2)
+    rows = None
+    if sample_rows is not None and sample_rows < n:
+        rows = np.sort(np.random.default_rng(seed).choice(n, size=sample_rows, replace=False))
+
+    # centered + scaled in float64 one column at a time (1e6 + 1e-2 * x keeps
+    # its signal); only the z-scores are stored as float32
+    x = np.empty((n if rows is None else len(rows), num_df.shape[1]), dtype=np.float32)
+    for j, col in enumerate(num_df.columns):
+        values = num_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if rows is not None:
+            values = values[rows]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN column
+            mean = np.nanmean(values)
+            std = np.nanstd(values)
+        if not std > 0:
+            std = 1.0  # constant column -> zero variance -> NaN later
+        x[:, j] = (values - mean) / std
+
+    mask = ~np.isnan(x)
+    if mask.all():
+        return x, None
+    x[~mask] = 0.0
+    return x, mask.astype(np.float32)
+
+
+def _block_corr(xi, xj, mi, mj) -> np.ndarray:
+    if mi is None:
+        n = xi.shape[0]
+        sxy = xi.T @ xj
+        sx = xi.sum(axis=0)[:, None]
+        sy = xj.sum(axis=0)[None, :]
+        sxx = (xi * xi).sum(axis=0)[:, None]
+        syy = (xj * xj).sum(axis=0)[None, :]
+    else:
+        # pairwise-complete rows, like pandas: only rows where both values exist
+        n = mi.T @ mj
+        sxy = xi.T @ xj
+        sx = xi.T @ mj
+        sy = mi.T @ xj
+        sxx = (xi * xi).T @ mj
+        syy = mi.T @ (xj * xj)
+    cov = n * sxy.astype(np.float64) - sx.astype(np.float64) * sy
+    var = (n * sxx.astype(np.float64) - sx.astype(np.float64) ** 2) * (n * syy.astype(np.float64) - sy.astype(np.float64) ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = cov / np.sqrt(var)
+    out[~(var > 0)] = np.nan
+    return np.clip(out, -1.0, 1.0)
+
+
+def correlation_matrix(
+    num_df: pd.DataFrame,
+    sample_rows: int | None = None,
+    block_cols: int = BLOCK_COLS,
+    seed: int = 0,
+    token=None,
+) -> pd.DataFrame:
+    """
+    Pearson correlation like num_df.corr(), computed in column blocks on
+    standardized float32 data. Cached per data + columns + sample size;
+    `token` identifies the data (e.g. dataset hash + filters), else the
+    frame is hashed.
+    """
+    data = token if token is not None else frame_fingerprint(num_df)
+    key = ("corr", data, tuple(num_df.columns), sample_rows, seed)
+    cached = governor.get(key)
+    if cached is not None:
+        return cached
+
+    x, mask = _standardized(num_df, sample_rows, seed)
+    p = x.shape[1]
+    corr = np.empty((p, p), dtype=np.float64)
+    starts = range(0, p, block_cols)
+    for i in starts:
+        xi = x[:, i:i + block_cols]
+        mi = None if mask is None else mask[:, i:i + block_cols]
+        for j in starts:
+            if j < i:
+                continue
+            xj = x[:, j:j + block_cols]
+            mj = None if mask is None else mask[:, j:j + block_cols]
+            block = _block_corr(xi, xj, mi, mj)
+            corr[i:i + block_cols, j:j + block_cols] = block
+            corr[j:j + block_cols, i:i + block_cols] = block.T
+    diag = np.diag(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diag), np.nan, 1.0))
+
+    result = pd.DataFrame(corr, index=num_df.columns, columns=num_df.columns)
+    return governor.put(key, result, kind="stats")
+
+
+# ========== Views on a (large) matrix ==========
+
+def top_pairs(corr: pd.DataFrame, k: int = 20) -> pd.DataFrame:
+    """Strongest |r| column pairs (each pair once)."""
+    values = corr.to_numpy()
+    iu, ju = np.triu_indices(len(values), k=1)
+    r = values[iu, ju]
+    keep = ~np.isnan(r)
+    iu, ju, r = iu[keep], ju[keep], r[keep]
+    k = min(k, len(r))
+    if k == 0:
+        return pd.DataFrame({"column_1": [], "column_2": [], "corr": []})
+    top = np.argpartition(-np.abs(r), k - 1)[:k]
+    top = top[np.argsort(-np.abs(r[top]))]
+    return pd.DataFrame({
+        "column_1": corr.columns[iu[top]],
+        "column_2": corr.columns[ju[top]],
+        "corr": r[top],
+    })
+
+
+def strongest_columns(corr: pd.DataFrame, max_cols: int) -> list:
+    """Columns with the largest sum of |r| to the others."""
+    if len(corr) <= max_cols:
+        return list(corr.columns)
+    strength = np.nansum(np.abs(corr.to_numpy()), axis=0) - 1.0
+    keep = np.sort(np.argpartition(-strength, max_cols - 1)[:max_cols])
+    return list(corr.columns[keep])
+
+
+def cluster_order(corr: pd.DataFrame) -> list:
+    """Order columns so correlated ones sit together (hierarchical if scipy is there)."""
+    if len(corr) < 3:
+        return list(corr.columns)
+    filled = np.nan_to_num(corr.to_numpy(), nan=0.0)
+    try:
+        from scipy.cluster.hierarchy import leaves_list, linkage
+        from scipy.spatial.distance import squareform
+
+        dist = np.clip(1.0 - np.abs(filled), 0.0, None)
+        np.fill_diagonal(dist, 0.0)
+        order = leaves_list(linkage(squareform(dist, checks=False), method="average"))
+    except ImportError:
+        # spectral fallback: angle in the plane of the two leading eigenvectors
+        _, vecs = np.linalg.eigh(np.abs(filled))
+        order = np.argsort(np.arctan2(vecs[:, -2], vecs[:, -1]))
+    return list(corr.columns[order])
+
+
+def heatmap_matrix(corr: pd.DataFrame, max_cols: int = 30, cluster: bool = True) -> pd.DataFrame:
+    """Readable sub-matrix: strongest `max_cols` columns, optionally clustered."""
+    cols = strongest_columns(corr, max_cols)
+    sub = corr.loc[cols, cols]
+    if cluster:
+        order = cluster_order(sub)
+        sub = sub.loc[order, order]
+    return sub
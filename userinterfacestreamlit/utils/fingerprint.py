@@ -0,0 +1,16 @@
+import hashlib
+
+import pandas as pd
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a frame (values + column names + dtypes).
+    Vectorized per-row hashing – far cheaper than the analyses it keys.
+    """
+    h = hashlib.sha1()
+    h.update(repr(list(df.columns)).encode("utf-8"))
+    h.update(repr([str(t) for t in df.dtypes]).encode("utf-8"))
+    h.update(str(df.shape).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
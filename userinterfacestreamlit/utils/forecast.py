@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+
+from utils.fingerprint import frame_fingerprint
+from utils.memory import governor
+from utils.parallel import map_in_processes
+from utils.timeseries import as_datetime
+
+# ========== Settings ==========
+
+MODELS = ["linear", "holt"]
+# Holt runs ~10 µs per point; below this many points in total a serial loop
+# beats starting worker processes (spawn + import costs seconds)
+HOLT_PROCESS_MIN_POINTS = 2_000_000
+# series that get history + forecast rows in the plot frame (panels shown)
+PLOT_SERIES = 12
+# Holt smoothing parameters tried per series (best in-sample SSE wins)
+_HOLT_GRID = [(a, b) for a in (0.1, 0.3, 0.5, 0.7, 0.9) for b in (0.05, 0.1, 0.3, 0.5)]
+
+
+# ========== x axis (numbers / datetimes / anything else) ==========
+
+def _epoch(x: pd.Series) -> pd.Timestamp:
+    return pd.Timestamp(0, tz=x.dt.tz)
+
+
+def numeric_axis(x: pd.Series) -> np.ndarray:
+    """x as float: numbers as is, datetimes in epoch seconds (real spacing), others by position."""
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return (x - _epoch(x)).dt.total_seconds().to_numpy(dtype=float)
+    if pd.api.types.is_numeric_dtype(x) and not pd.api.types.is_bool_dtype(x):
+        return x.to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def future_positions(x_num: np.ndarray, periods: int) -> np.ndarray:
+    """Next `periods` x positions, one median step apart."""
+    uniq = np.unique(x_num)
+    step = float(np.median(np.diff(uniq))) if len(uniq) > 1 else 1.0
+    return x_num.max() + step * np.arange(1, periods + 1)
+
+
+def future_axis(x: pd.Series, x_num: np.ndarray, periods: int) -> tuple[np.ndarray, list]:
+    """Next `periods` x positions (numeric) and their display values."""
+    future_num = future_positions(x_num, periods)
+
+    if pd.api.types.is_datetime64_any_dtype(x):
+        future_x = list(_epoch(x) + pd.to_timedelta(future_num, unit="s"))
+    elif pd.api.types.is_numeric_dtype(x) and not pd.api.types.is_bool_dtype(x):
+        future_x = list(future_num)
+    else:
+        future_x = [f"{x.name}_t+{i + 1}" for i in range(periods)]
+    return future_num, future_x
+
+
+# ========== Models ==========
+
+def fit_linear_batch(x: np.ndarray, Y: np.ndarray, groups: np.ndarray | None = None, n_groups: int = 1) -> dict:
+    """
+    Least-squares line for every column of Y (n x k) – and for every group
+    code in `groups` – in one vectorized pass of sums. NaNs are skipped per
+    series. Returns slope, intercept, r2, n arrays of shape (n_groups, k).
+    """
+    if groups is None:
+        groups = np.zeros(len(x), dtype=np.intp)
+
+    def total(v: np.ndarray) -> np.ndarray:
+        # per-group column sums: (n, k) -> (n_groups, k)
+        return np.stack(
+            [np.bincount(groups, weights=v[:, j], minlength=n_groups) for j in range(v.shape[1])],
+            axis=1,
+        )
+
+    mask = ~np.isnan(Y)
+    w = mask.astype(float)
+    y0 = np.where(mask, Y, 0.0)
+    x_mean = float(np.mean(x)) if len(x) else 0.0
+    xc = (x - x_mean)[:, None]  # centred for numerical stability (epoch seconds)
+    n = total(w)
+    sx = total(xc * w)
+    sy = total(y0)
+    sxx = total(xc * xc * w)
+    sxy = total(xc * y0)
+    syy = total(y0 * y0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        den = n * sxx - sx ** 2
+        slope = np.where(den > 0, (n * sxy - sx * sy) / den, 0.0)
+        intercept_c = (sy - slope * sx) / n
+        ss_tot = syy - sy ** 2 / n
+        ss_res = syy - intercept_c * sy - slope * sxy
+        r2 = np.where(ss_tot > 0, 1.0 - ss_res / ss_tot, np.nan)
+    return {
+        "slope": slope,
+        "intercept": intercept_c - slope * x_mean,
+        "r2": r2,
+        "n": n.astype(int),
+    }
+
+
+def holt_forecast(y: np.ndarray, periods: int) -> tuple[np.ndarray, float]:
+    """
+    Holt's linear exponential smoothing; all grid parameters run side by side.
+    Returns (forecast, in-sample RMSE). Assumes evenly spaced points.
+    """
+    y = y[~np.isnan(y)]
+    if len(y) < 3:
+        return np.full(periods, y[-1] if len(y) else np.nan), np.nan
+    alpha = np.array([g[0] for g in _HOLT_GRID])
+    beta = np.array([g[1] for g in _HOLT_GRID])
+    level = np.full(len(alpha), y[0])
+    trend = np.full(len(alpha), y[1] - y[0])
+    sse = np.zeros(len(alpha))
+    for value in y[1:]:
+        pred = level + trend
+        sse += (value - pred) ** 2
+        new_level = alpha * value + (1 - alpha) * pred
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    best = int(np.argmin(sse))
+    forecast = level[best] + trend[best] * np.arange(1, periods + 1)
+    return forecast, float(np.sqrt(sse[best] / (len(y) - 1)))
+
+
+# ========== Batch entry point ==========
+
+def _label(col: str, group_col: str | None, key, n_cols: int) -> str:
+    if group_col is None:
+        return col
+    return f"{col} | {group_col}={key}" if n_cols > 1 else f"{group_col}={key}"
+
+
+def batch_forecast(
+    df: pd.DataFrame,
+    x_col: str,
+    y_cols: list[str],
+    group_col: str | None = None,
+    periods: int = 10,
+    model: str = "linear",
+    plot_series: int = PLOT_SERIES,
+    token=None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Forecast every value column (x every group of `group_col`) at once.
+    linear -> one vectorized least-squares pass over all series,
+    holt   -> serial loop; worker processes (chunked) only for very large batches.
+    Text date columns on x are parsed like the single-series forecast.
+    Returns (summary table – one row per series, long plot frame with
+    columns series / x / y / type for the first `plot_series` series).
+    Cached per data + settings (`token` identifies the data, else it is hashed).
+    """
+    y_cols = list(y_cols)
+    cols = list(dict.fromkeys([x_col] + ([group_col] if group_col else []) + y_cols))
+    data = token if token is not None else frame_fingerprint(df[cols])
+    key = ("forecast", data, x_col, tuple(y_cols), group_col, periods, model, plot_series)
+    cached = governor.get(key)
+    if cached is not None:
+        return cached
+
+    data = df[cols]
+    ts = as_datetime(data[x_col])
+    if ts is not None:
+        data = data.assign(**{x_col: ts})
+    data = data.dropna(subset=[x_col] + ([group_col] if group_col else []))
+    if group_col is None:
+        codes, keys = np.zeros(len(data), dtype=np.intp), [None]
+    else:
+        codes, keys = pd.factorize(data[group_col], sort=True)
+
+    # one sort: rows grouped by series, in x order inside a series (labels
+    # keep their data order) -> every series is a contiguous slice
+    x = data[x_col].reset_index(drop=True)
+    sortable = pd.api.types.is_datetime64_any_dtype(x) or pd.api.types.is_numeric_dtype(x)
+    x_num = numeric_axis(x)
+    order = np.lexsort((x_num, codes)) if sortable else np.argsort(codes, kind="stable")
+    codes, x = codes[order], x.iloc[order].reset_index(drop=True)
+    Y = data[y_cols].to_numpy(dtype=float, na_value=np.nan)[order]
+    bounds = np.searchsorted(codes, np.arange(len(keys) + 1))
+    if sortable:
+        x_num = x_num[order]
+    else:
+        # labels: position inside their own series
+        x_num = np.arange(len(x), dtype=float) - np.repeat(bounds[:-1], np.diff(bounds)).astype(float)
+
+    # (group, column) pairs with enough points to fit
+    counts = np.stack(
+        [np.bincount(codes, weights=~np.isnan(Y[:, k]), minlength=len(keys)) for k in range(len(y_cols))],
+        axis=1,
+    ) if len(data) else np.zeros((len(keys), len(y_cols)))
+    pairs = [(g, k) for g in range(len(keys)) for k in range(len(y_cols)) if counts[g, k] >= 2]
+
+    if model == "linear":
+        fit = fit_linear_batch(x_num, Y, codes, len(keys))
+    else:
+        tasks = [(Y[bounds[g]:bounds[g + 1], k], periods) for g, k in pairs]
+        if sum(len(t[0]) for t in tasks) >= HOLT_PROCESS_MIN_POINTS:
+            holt = map_in_processes(holt_forecast, tasks, chunked=True)
+        else:
+            holt = [holt_forecast(*t) for t in tasks]
+
+    rows, plot_parts = [], []
+    is_dates = pd.api.types.is_datetime64_any_dtype(x)
+    for i, (g, k) in enumerate(pairs):
+        sel = slice(bounds[g], bounds[g + 1])
+        y_g = Y[sel, k]
+        future_num = future_positions(x_num[sel], periods)
+        row = {"series": _label(y_cols[k], group_col, keys[g], len(y_cols)), "model": model,
+               "points": int(counts[g, k])}
+        if model == "linear":
+            forecast = fit["slope"][g, k] * future_num + fit["intercept"][g, k]
+            if is_dates:
+                row.update(slope_per_day=fit["slope"][g, k] * 86400, r2=fit["r2"][g, k])
+            else:
+                row.update(slope=fit["slope"][g, k], r2=fit["r2"][g, k])
+        else:
+            forecast, rmse = holt[i]
+            row.update(rmse=rmse)
+        row.update({"last_actual": y_g[~np.isnan(y_g)][-1], f"forecast_t+{periods}": forecast[-1]})
+        rows.append(row)
+        if i >= plot_series:
+            continue
+        # display values only for the series that are drawn
+        x_g = x[sel]
+        future_x = future_axis(x_g, x_num[sel], periods)[1]
+        plot_parts.append(pd.DataFrame({"series": row["series"], "x": x_g.to_numpy(), "y": y_g, "type": "History"}))
+        plot_parts.append(pd.DataFrame({"series": row["series"], "x": future_x, "y": forecast, "type": "Forecast"}))
+
+    table = pd.DataFrame(rows, columns=None if rows else ["series", "model", "points"])
+    plot_df = pd.concat(plot_parts, ignore_index=True) if plot_parts else pd.DataFrame(columns=["series", "x", "y", "type"])
+    return governor.put(key, (table, plot_df), kind="stats")
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from utils.analysis import get_missing_values
+from utils.memory import governor
+
+# ========== Settings ==========
+
+# correlation sums are p x p matrices – kept only up to this many numeric columns
+CORR_MAX_COLS = 500
+# aggregates that combine from per-chunk partials (median does not)
+INCREMENTAL_AGGS = ("sum", "mean", "count", "min", "max")
+# rows per block for the correlation sums (bounds the float64 temporaries)
+ROW_BLOCK = 65_536
+
+
+# ========== Schema check ==========
+
+def check_schema(base: pd.DataFrame, chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    New rows in the loaded frame's column order and dtypes.
+    Raises ValueError when a column is missing or its values do not fit.
+    """
+    missing = [c for c in base.columns if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"New rows are missing column(s): {', '.join(map(str, missing))}")
+    chunk = chunk[list(base.columns)]
+
+    out = {}
+    for col in base.columns:
+        want, s = base[col].dtype, chunk[col]
+        if s.isna().all():
+            # nothing to check; kept in the loaded dtype where it holds missing values
+            # (an unchanged dtype keeps the column's cached results – see append_column_hashes)
+            try:
+                out[col] = s.astype(want)
+            except (ValueError, TypeError):
+                out[col] = s  # e.g. int64 – concat picks the common dtype
+        elif pd.api.types.is_numeric_dtype(want) and not pd.api.types.is_bool_dtype(want):
+            if not pd.api.types.is_numeric_dtype(s):
+                raise ValueError(f"Column '{col}': expected numbers, got {s.dtype}")
+            out[col] = s
+        elif pd.api.types.is_datetime64_any_dtype(want):
+            try:
+                out[col] = pd.to_datetime(s).astype(want)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"Column '{col}': expected dates ({e})") from e
+        elif pd.api.types.is_string_dtype(want) and not pd.api.types.is_string_dtype(s):
+            # e.g. codes that look numeric in this chunk – keep them as text
+            out[col] = s.astype(str).where(s.notna())
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=chunk.index)
+
+
+# ========== Running statistics ==========
+
+def _group_partials(df: pd.DataFrame, group_col: str, value_col: str) -> pd.DataFrame:
+    g = df.groupby(group_col)[value_col]
+    return pd.DataFrame({"sum": g.sum(), "count": g.count(), "min": g.min(), "max": g.max()})
+
+
+class DatasetProfile:
+    """
+    Statistics of a growing dataset, updated from each appended chunk only:
+    missing counts, group-by partials and correlation sums.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.columns = list(df.columns)
+        self.rows = 0
+        self.missing = pd.Series(0, index=df.columns, dtype="int64")
+        self.numeric = df.select_dtypes(include="number").columns.tolist()
+        k = len(self.numeric)
+        # correlation sums over pairwise-complete rows, on values shifted by the
+        # first chunk's means (keeps n*sxy - sx*sy well conditioned)
+        self._corr = None
+        if 2 <= k <= CORR_MAX_COLS:
+            shift = df[self.numeric].mean().fillna(0.0).to_numpy(dtype=float)
+            self._corr = {"shift": shift, **{s: np.zeros((k, k)) for s in ("n", "sx", "sxx", "sxy")}}
+        self._groups: dict[tuple, pd.DataFrame] = {}
+        self.changed_columns: list = []
+        self._add(df)
+
+    def __sizeof__(self) -> int:
+        # what the memory governor accounts for
+        arrays = list(self._corr.values()) if self._corr is not None else []
+        groups = sum(int(g.memory_usage(deep=True).sum()) for g in self._groups.values())
+        return sum(a.nbytes for a in arrays) + groups + int(self.missing.memory_usage())
+
+    def _add(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        nulls = get_missing_values(chunk)["missing_count"]
+        self.missing += nulls
+
+        if self._corr is not None:
+            c = self._corr
+            for start in range(0, len(chunk), ROW_BLOCK):
+                x = chunk.iloc[start:start + ROW_BLOCK][self.numeric].to_numpy(dtype=float, na_value=np.nan)
+                mask = ~np.isnan(x)
+                m = mask.astype(float)
+                x0 = np.where(mask, x - c["shift"], 0.0)
+                c["n"] += m.T @ m
+                c["sx"] += x0.T @ m       # sx[i, j] = sum of column i where j is present too
+                c["sxx"] += (x0 * x0).T @ m
+                c["sxy"] += x0.T @ x0
+
+        for (group_col, value_col), parts in self._groups.items():
+            new = _group_partials(chunk, group_col, value_col)
+            both = pd.concat([parts, new])
+            self._groups[(group_col, value_col)] = both.groupby(level=0).agg(
+                {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+            )
+
+        # columns the new rows fill – cached results over the others stay valid
+        self.changed_columns = [c for c in self.columns if nulls[c] < len(chunk)]
+
+    def append(self, chunk: pd.DataFrame):
+        """Fold new rows (already schema-checked) into every statistic."""
+        self._add(chunk)
+
+    # ---------- results ----------
+
+    def missing_counts(self) -> pd.DataFrame:
+        # same shape as utils.analysis.get_missing_values
+        return self.missing.to_frame("missing_count")
+
+    def correlation(self) -> pd.DataFrame | None:
+        """Pearson matrix like df[numeric].corr(); None when too wide to track."""
+        if self._corr is None:
+            return None
+        c = self._corr
+        n, sx, sxx, sxy = c["n"], c["sx"], c["sxx"], c["sxy"]
+        sy, syy = sx.T, sxx.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+            corr = (n * sxy - sx * sy) / np.sqrt(var)
+        corr[~(var > 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diag = np.diag(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diag), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.numeric, columns=self.numeric)
+
+    def group_agg(self, df: pd.DataFrame, group_col: str, value_col: str, agg_func: str) -> pd.DataFrame | None:
+        """
+        Same result as the backend group_agg. The first call for a column pair
+        scans `df` (the current full frame); later appends only add their chunk.
+        None for aggregates that cannot be combined (median).
+        """
+        if agg_func not in INCREMENTAL_AGGS:
+            return None
+        key = (group_col, value_col)
+        if key not in self._groups:
+            self._groups[key] = _group_partials(df, group_col, value_col)
+        parts = self._groups[key]
+        if agg_func == "mean":
+            values = parts["sum"] / parts["count"].where(parts["count"] > 0)
+        else:
+            values = parts[agg_func]
+        if agg_func == "count":
+            values = values.astype("int64")
+        return values.rename(value_col).rename_axis(group_col).sort_index().reset_index()
+
+
+def store_profile(state, profile: DatasetProfile | None):
+    """Keep the session's profile in the memory governor (None drops it)."""
+    key = ("profile", state.get("df_key"))
+    if profile is None:
+        governor.discard(key)
+    else:
+        governor.put(key, profile, kind="profile")
+
+
+def current_profile(state, df: pd.DataFrame) -> DatasetProfile | None:
+    """
+    The session's profile if it describes exactly `df` (else None – also
+    once evicted; the pages then compute from the data).
+    """
+    profile = governor.get(("profile", state.get("df_key")))
+    if profile is None or profile.rows != len(df) or profile.columns != list(df.columns):
+        return None
+    return profile
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.memory import governor
+
+# ========== Settings ==========
+
+# Worker threads shared by all sessions
+JOB_WORKERS_ENV = "ADE_JOB_WORKERS"
+# Finished jobs kept for re-display / reuse (their results live in the memory governor)
+MAX_FINISHED = 32
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+def worker_count() -> int:
+    return max(1, int(os.environ.get(JOB_WORKERS_ENV, "2")))
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by report() once cancel() was requested."""
+
+
+# ========== Job ==========
+
+class Job:
+    """
+    One background task. The function runs as fn(job, *args) and calls
+    job.report(fraction, message) between steps – that is also where a
+    cancel request stops it. Arguments are dropped once it finishes; the
+    result is held by the memory governor (kind "results").
+    """
+
+    def __init__(self, name: str, key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.key = key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self.created = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._future = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def result(self):
+        """Return value of a done job (None once evicted under memory pressure)."""
+        return governor.get(("job", self.id))
+
+    @property
+    def released(self) -> bool:
+        # done, but the governor dropped the result – run again to get it back
+        return self.status == "done" and self.result is None
+
+    def report(self, fraction: float, message: str = ""):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+
+    def cancel(self):
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            # never started
+            self.status = "cancelled"
+            self.finished_at = time.time()
+            self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+# ========== Runner ==========
+
+class JobRunner:
+    """Worker pool + registry of jobs by id; a finished job's result is reused by key."""
+
+    def __init__(self, workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ade-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._by_key: dict = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn, *args, key=None, **kwargs) -> Job:
+        """
+        Queue fn(job, *args, **kwargs). With a `key`, a queued, running or
+        finished job for the same key is returned instead of starting again.
+        """
+        with self._lock:
+            if key is not None and key in self._by_key:
+                job = self._jobs.get(self._by_key[key])
+                if job is not None and job.status not in ("failed", "cancelled") and not job.released:
+                    return job
+            job = Job(name, key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+        job._future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status = "running"
+        try:
+            governor.put(("job", job.id), fn(job, *args, **kwargs), kind="results")
+            job.progress = 1.0
+            job.status = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            job._done.set()
+            self._trim()
+
+    def _trim(self):
+        with self._lock:
+            done = [j for j in self._jobs.values() if j.finished]
+            for job in done[:max(0, len(done) - MAX_FINISHED)]:
+                self._jobs.pop(job.id, None)
+                governor.discard(("job", job.id))
+                if job.key is not None and self._by_key.get(job.key) == job.id:
+                    del self._by_key[job.key]
+
+    def get(self, job_id: str | None) -> Job | None:
+        if job_id is None:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def active(self) -> list[Job]:
+        with self._lock:
+            return [j for j in self._jobs.values() if not j.finished]
+
+
+runner = JobRunner(worker_count())
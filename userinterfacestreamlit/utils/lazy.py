@@ -0,0 +1,28 @@
+import importlib
+import importlib.util
+
+
+class LazyModule:
+    """Module stand-in: the real import happens on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def is_installed(name: str) -> bool:
+    # top-level package only – find_spec("a.b") would import "a"
+    try:
+        return importlib.util.find_spec(name.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name: str):
+    """LazyModule for an optional package, or None when it is not installed."""
+    return LazyModule(name) if is_installed(name) else None
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from io import BytesIO
+from xml.etree import ElementTree
+
+import pandas as pd
+
+from utils.backend import get_backend
+
+from utils.lazy import is_installed, lazy_import
+from utils.memory import governor
+from utils.parallel import map_in_processes
+
+# pyarrow is optional – needed only for Parquet / Feather (imported on first use)
+pq = lazy_import("pyarrow.parquet")
+pa_ipc = lazy_import("pyarrow.ipc")
+pa_types = lazy_import("pyarrow.types")
+
+# python-calamine = Rust Excel reader (pandas engine="calamine"), else openpyxl / xlrd
+EXCEL_ENGINE = "calamine" if is_installed("python_calamine") else None
+# smaller workbooks parse their sheets in this process (starting workers costs ~2 s)
+EXCEL_PROCESS_MIN_BYTES = 10 * 1024 * 1024
+
+# zstandard is optional – .csv.zst is offered only when pandas can decompress it
+ZSTD_AVAILABLE = is_installed("zstandard")
+
+# ========== Supported inputs ==========
+
+# extensions accepted by the uploader (".csv.gz" is checked as "gz")
+UPLOAD_TYPES = ["csv", "gz"] + (["zst"] if ZSTD_AVAILABLE else []) + ["parquet", "feather", "arrow", "xlsx", "xls"]
+
+# ops pyarrow can push down with the same NaN semantics as pandas
+_PUSHDOWN_OPS = {"==": "==", ">": ">", "<": "<", ">=": ">=", "<=": "<="}
+
+
+def file_format(name: str) -> str:
+    lower = name.lower()
+    if lower.endswith((".csv", ".csv.gz", ".csv.zst", ".gz", ".zst")):
+        return "csv"
+    if lower.endswith(".parquet"):
+        return "parquet"
+    if lower.endswith((".feather", ".arrow")):
+        return "feather"
+    if lower.endswith((".xlsx", ".xls")):
+        return "excel"
+    raise ValueError(f"Unsupported file type: {name}")
+
+
+def csv_compression(name: str) -> str | None:
+    lower = name.lower()
+    if lower.endswith(".gz"):
+        return "gzip"
+    if lower.endswith(".zst"):
+        _need_zstandard()
+        return "zstd"
+    return None
+
+
+def _need_pyarrow(fmt: str):
+    if pq is None:
+        raise RuntimeError(f"Reading {fmt} files needs the 'pyarrow' package.")
+
+
+def _need_zstandard():
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("Reading .zst files needs the 'zstandard' package.")
+
+
+def _typed_value(val, numeric: bool):
+    """Filter value typed as text -> number for numeric columns, text otherwise."""
+    if not numeric:
+        return str(val)
+    try:
+        num = float(val)
+    except (TypeError, ValueError):
+        return val  # bad filter – the compare fails and the filter is ignored
+    return int(num) if num.is_integer() else num
+
+
+# ========== Excel: sheets, parallel parse, cache ==========
+
+def workbook_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def list_sheets(data: bytes, name: str) -> list[str]:
+    """Sheet names without parsing any sheet."""
+    if name.lower().endswith(".xlsx"):
+        # sheet names live in xl/workbook.xml – no cell is touched
+        try:
+            with zipfile.ZipFile(BytesIO(data)) as zf:
+                root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+            return [el.get("name") for el in root.iter() if el.tag.endswith("}sheet")]
+        except (KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+            pass
+    return list(pd.ExcelFile(BytesIO(data), engine=EXCEL_ENGINE).sheet_names)
+
+
+def _parse_sheet(source, sheet: str, columns: tuple | None) -> pd.DataFrame:
+    # bytes here, or a file path in a worker process; usecols as callable so a missing column is no error
+    usecols = None if columns is None else (lambda c: c in columns)
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    return pd.read_excel(source, sheet_name=sheet, engine=EXCEL_ENGINE, usecols=usecols)
+
+
+def read_excel_sheets(data: bytes, sheets: list[str], columns: list[str] | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Parse the chosen sheets – several at once in worker processes for big
+    workbooks (they read one temp copy of the file). Results are cached by (workbook hash, sheet, columns); spilled to disk
+    rather than parsed again when memory is short.
+    """
+    digest = workbook_hash(data)
+    cols = None if columns is None else tuple(columns)
+    out, todo = {}, []
+    for sheet in sheets:
+        cached = governor.get(("sheet", digest, sheet, cols))
+        if cached is not None:
+            out[sheet] = cached
+        else:
+            todo.append(sheet)
+
+    if len(todo) > 1 and len(data) >= EXCEL_PROCESS_MIN_BYTES:
+        # workers get a path, not the workbook bytes pickled once per sheet
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            frames = map_in_processes(_parse_sheet, [(path, sheet, cols) for sheet in todo])
+        finally:
+            os.remove(path)
+    else:
+        frames = [_parse_sheet(data, sheet, cols) for sheet in todo]
+    parsed = dict(zip(todo, frames))
+
+    for sheet, frame in parsed.items():
+        governor.put(("sheet", digest, sheet, cols), frame, kind="derived", spill=True)
+    out.update(parsed)
+    return {sheet: out[sheet] for sheet in sheets}
+
+
+def combine_sheets(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """One sheet -> as is; several -> stacked with a 'Sheet' column."""
+    if len(frames) == 1:
+        return next(iter(frames.values()))
+    return pd.concat(
+        [frame.assign(Sheet=sheet) for sheet, frame in frames.items()],
+        ignore_index=True,
+    )
+
+
+# ========== Schema (no data read) ==========
+
+def list_columns(file, name: str, sheet: str | int = 0) -> list[str]:
+    """Column names only – Parquet/Feather footers or the CSV/Excel header row."""
+    fmt = file_format(name)
+    file.seek(0)
+    try:
+        if fmt == "parquet":
+            _need_pyarrow("Parquet")
+            return pq.ParquetFile(file).schema_arrow.names
+        if fmt == "feather":
+            _need_pyarrow("Feather")
+            return pa_ipc.open_file(file).schema.names
+        if fmt == "csv":
+            return pd.read_csv(file, nrows=0, compression=csv_compression(name)).columns.tolist()
+        # the Excel reader parses the sheet even for nrows=0 – once per upload + sheet
+        file_id = getattr(file, "file_id", None) or workbook_hash(file.getvalue())
+        key = ("excel_columns", file_id, sheet)
+        cached = governor.get(key)
+        if cached is None:
+            cached = pd.read_excel(file, sheet_name=sheet, nrows=0, engine=EXCEL_ENGINE).columns.tolist()
+            governor.put(key, cached, kind="stats")
+        return cached
+    finally:
+        file.seek(0)
+
+
+# ========== Load ==========
+
+def read_table(
+    file,
+    name: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    sheets: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Read only `columns` (None = all) and keep rows matching `filters`
+    ((column, operator, value) specs, same as the chart page filters).
+    Parquet skips whole row groups using their min/max statistics.
+    Excel reads `sheets` (None = first sheet).
+    """
+    fmt = file_format(name)
+    filters = list(filters or [])
+    # filter columns are read too, then dropped if not asked for
+    read_cols = None
+    if columns is not None:
+        read_cols = list(dict.fromkeys(list(columns) + [f[0] for f in filters]))
+
+    file.seek(0)
+    if fmt == "parquet":
+        _need_pyarrow("Parquet")
+        schema = pq.ParquetFile(file).schema_arrow
+        file.seek(0)
+        pushed = []
+        for c, op, v in filters:
+            if op in _PUSHDOWN_OPS and c in schema.names:
+                numeric = pa_types.is_integer(schema.field(c).type) or pa_types.is_floating(schema.field(c).type)
+                pushed.append((c, _PUSHDOWN_OPS[op], _typed_value(v, numeric)))
+        try:
+            df = pd.read_parquet(file, columns=read_cols, filters=pushed or None)
+            filters = [f for f in filters if f[1] not in _PUSHDOWN_OPS or f[0] not in schema.names]
+        except Exception:
+            # e.g. value type does not match the column – filter in pandas instead
+            file.seek(0)
+            df = pd.read_parquet(file, columns=read_cols)
+    elif fmt == "feather":
+        _need_pyarrow("Feather")
+        df = pd.read_feather(file, columns=read_cols)
+    elif fmt == "csv":
+        df = pd.read_csv(file, usecols=read_cols, compression=csv_compression(name))
+    else:
+        data = file.read()
+        frames = read_excel_sheets(data, sheets or list_sheets(data, name)[:1], read_cols)
+        df = combine_sheets(frames)
+
+    backend = get_backend()
+    for col, op, val in filters:
+        try:
+            if op != "contains":
+                val = _typed_value(val, pd.api.types.is_numeric_dtype(df[col]))
+            df = backend.filter_rows(df, col, op, val)
+        except Exception:
+            pass  # same as the chart page: a bad filter is ignored
+
+    if columns is not None:
+        # drop filter-only columns; keep added ones such as "Sheet"
+        extra = [c for c in df.columns if c not in read_cols]
+        df = df[[c for c in columns if c in df.columns] + extra]
+    return df.reset_index(drop=True) if filters else df
@@ -0,0 +1,238 @@
+import atexit
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ========== Settings ==========
+
+# Process-wide budget (MB) for everything the governor tracks, all sessions together
+MEMORY_BUDGET_ENV = "ADE_MEMORY_BUDGET_MB"
+# Where evicted datasets / frames are spilled (default: system temp dir)
+SPILL_DIR_ENV = "ADE_SPILL_DIR"
+
+# kinds shown in the usage report
+KINDS = ["dataset", "derived", "stats", "profile", "results"]
+# spilled files may use this many times the memory budget on disk
+SPILL_FACTOR = 4
+
+
+def budget_bytes() -> int:
+    return int(float(os.environ.get(MEMORY_BUDGET_ENV, "1024")) * 1024 * 1024)
+
+
+def estimate_bytes(obj) -> int:
+    """Approximate memory held by a cached value."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_bytes(v) for v in obj)
+    if isinstance(obj, dict):
+        return sum(estimate_bytes(v) for v in obj.values())
+    return sys.getsizeof(obj)
+
+
+# ========== Governor ==========
+
+class MemoryGovernor:
+    """
+    One LRU store for datasets, derived frames, statistics and shared
+    results (aggregates + figure JSON) of every session. Above the byte budget the least recently used entries
+    go first: spillable ones are written to disk (read back on the next
+    get), the rest are dropped and recomputed by their owner.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._spill_dir = None
+        self.hits = 0
+        self.misses = 0
+
+    def _spill_path(self) -> str:
+        if self._spill_dir is None:
+            base = os.environ.get(SPILL_DIR_ENV) or tempfile.gettempdir()
+            os.makedirs(base, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix="ade_spill_", dir=base)
+            atexit.register(shutil.rmtree, self._spill_dir, True)
+        return os.path.join(self._spill_dir, uuid.uuid4().hex + ".pkl")
+
+    # ---------- store / fetch ----------
+
+    def put(self, key: tuple, value, kind: str, spill: bool = False):
+        """Track `value` under `key`; may evict older entries right away."""
+        entry = {"value": value, "bytes": estimate_bytes(value), "kind": kind, "spill": spill, "path": None, "spilling": False}
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            spills = self._evict(keep=key)
+        self._spill(spills)
+        return value
+
+    def get(self, key: tuple, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if entry["path"] is None:
+                return entry["value"]
+            path = entry["path"]
+        # read a spilled value back outside the lock
+        try:
+            value = pd.read_pickle(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self._lock:
+                if self._entries.get(key) is entry:  # not a newer value put meanwhile
+                    self._remove(key)
+            return default
+        spills = []
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._unlink(entry)
+                entry["value"] = value
+                spills = self._evict(keep=key)
+        self._spill(spills)
+        return value
+
+    def discard(self, key: tuple):
+        with self._lock:
+            self._remove(key)
+
+    def discard_prefix(self, prefix: tuple):
+        """Drop every key that starts with `prefix` (e.g. one frame's sort orders)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[:len(prefix)] == prefix]:
+                self._remove(key)
+
+    # ---------- eviction ----------
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._unlink(entry)
+
+    @staticmethod
+    def _unlink(entry: dict):
+        if entry["path"] is not None:
+            try:
+                os.remove(entry["path"])
+            except OSError:
+                pass
+            entry["path"] = None
+
+    def _in_memory(self) -> int:
+        # entries being written to disk right now already count as spilled
+        return sum(e["bytes"] for e in self._entries.values() if e["path"] is None and not e["spilling"])
+
+    def _on_disk(self) -> int:
+        return sum(e["bytes"] for e in self._entries.values() if e["path"] is not None)
+
+    def _evict(self, keep: tuple) -> list:
+        """
+        Drop LRU entries down to the budget (caller holds the lock). Spillable
+        ones are only marked; returns them for _spill, which pickles outside the lock.
+        """
+        spills = []
+        used = self._in_memory()
+        for key in list(self._entries):
+            if used <= self.budget:
+                break
+            entry = self._entries.get(key)  # a frame's weakref callback may drop keys meanwhile
+            if entry is None or key == keep or entry["path"] is not None or entry["spilling"]:
+                continue
+            if entry["spill"]:
+                entry["spilling"] = True
+                spills.append((key, entry))
+            else:
+                self._remove(key)
+            used -= entry["bytes"]
+
+        # spilled files: oldest go once the disk share is used up
+        disk = self._on_disk()
+        for key in list(self._entries):
+            if disk <= self.budget * SPILL_FACTOR:
+                break
+            entry = self._entries.get(key)
+            if entry is not None and entry["path"] is not None:
+                disk -= entry["bytes"]
+                self._remove(key)
+        return spills
+
+    def _spill(self, spills: list):
+        # other sessions keep reading / writing the governor while this pickles
+        for key, entry in spills:
+            with self._lock:
+                path = self._spill_path()
+            try:
+                pd.to_pickle(entry["value"], path)
+            except (OSError, pickle.PicklingError, TypeError):
+                self._unlink({"path": path})
+                path = None
+            with self._lock:
+                entry["spilling"] = False
+                current = self._entries.get(key) is entry and entry["path"] is None
+                if path is not None and current:
+                    entry["path"], entry["value"] = path, None
+                    continue
+                if path is not None:
+                    self._unlink({"path": path})  # replaced or dropped meanwhile
+                elif current and entry["kind"] != "dataset":
+                    self._remove(key)  # a session's data is never lost – it stays in memory
+
+    # ---------- report ----------
+
+    def usage(self) -> dict:
+        with self._lock:
+            by_kind = {kind: 0 for kind in KINDS}
+            for e in self._entries.values():
+                if e["path"] is None:
+                    by_kind[e["kind"]] = by_kind.get(e["kind"], 0) + e["bytes"]
+            return {
+                "budget": self.budget,
+                "in_memory": sum(by_kind.values()),
+                "spilled": self._on_disk(),
+                "entries": len(self._entries),
+                "by_kind": by_kind,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+governor = MemoryGovernor(budget_bytes())
+
+
+# ========== Session datasets ==========
+
+def store_dataset(state, df: pd.DataFrame) -> pd.DataFrame:
+    """Keep the session's frame in the governor; the session only holds its key."""
+    key = state.get("df_key") or uuid.uuid4().hex
+    state["df_key"] = key
+    state["df_version"] = state.get("df_version", 0) + 1
+    return governor.put(("dataset", key), df, kind="dataset", spill=True)
+
+
+def load_dataset(state) -> pd.DataFrame | None:
+    key = state.get("df_key")
+    return None if key is None else governor.get(("dataset", key))
+
+
+def dataset_token(state) -> tuple:
+    """Identifies the session's current data (changes on reload / append) – for cache keys."""
+    return state.get("df_key"), state.get("df_version")
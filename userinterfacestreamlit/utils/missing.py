@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+from utils.memory import governor
+
+# ========== Settings ==========
+
+ROW_BUCKETS = 100         # rows of the missingness matrix
+PATTERN_MAX_COLS = 62     # patterns use the most-missing columns (one bit each in an int64, one more for the rest)
+PATTERN_CHUNK_BYTES = 1 << 17   # rows are decoded 1M (131072 bytes x 8) at a time
+
+# set bits per byte value (np.bitwise_count needs numpy >= 2)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits)
+    return _POPCOUNT[bits]
+
+
+def _append_bits(packed: np.ndarray | None, rows: int, isna: np.ndarray) -> np.ndarray:
+    """Packed bitmap of `rows` rows (None = no bit set) with `isna` appended."""
+    if packed is None:
+        packed = np.zeros((rows + 7) // 8, dtype=np.uint8)
+    tail = rows % 8
+    if tail:
+        # the last byte is partly filled – the new rows continue it
+        isna = np.concatenate([np.unpackbits(packed[-1:], count=tail).astype(bool), isna])
+        packed = packed[:-1]
+    return np.concatenate([packed, np.packbits(isna)])
+
+
+# ========== Null bitmaps ==========
+
+class NullBitmaps:
+    """
+    One packed bitmap (1 bit per row) per column that has missing values,
+    built column by column – never a full boolean frame. Counts, co-missing
+    pairs, row-bucket rates and row patterns all come from bitwise ops.
+    With a `token` the derived tables are kept in the memory governor too.
+    With `before` (the bitmaps of the rows above `df`) only df's rows are scanned.
+    """
+
+    def __init__(self, df: pd.DataFrame, token=None, before: "NullBitmaps | None" = None):
+        self.token = token
+        start = before.rows if before is not None else 0
+        self.rows = start + len(df)
+        self.columns = list(df.columns)
+        self.counts = np.zeros(len(self.columns), dtype=np.int64)
+        packed = {} if before is None else dict(zip(before.with_nulls, before.bits))
+        bitmaps = []
+        self.with_nulls = []  # positions (in columns) of the packed rows below
+        for i, col in enumerate(self.columns):
+            isna = df[col].isna().to_numpy()
+            n = int(isna.sum()) + (int(before.counts[i]) if before is not None else 0)
+            self.counts[i] = n
+            if n:
+                bitmaps.append(_append_bits(packed.get(i), start, isna))
+                self.with_nulls.append(i)
+        width = (self.rows + 7) // 8
+        self.bits = np.vstack(bitmaps) if bitmaps else np.zeros((0, width), dtype=np.uint8)
+
+    def __sizeof__(self) -> int:
+        # what the memory governor accounts for
+        return int(self.bits.nbytes + self.counts.nbytes)
+
+    def _kept(self, name: str, build, *args):
+        # derived table, built once per dataset version (reruns reuse it)
+        if self.token is None:
+            return build(*args)
+        key = ("missing", self.token, name, args)
+        found = governor.get(key)
+        if found is None:
+            found = governor.put(key, build(*args), kind="stats")
+        return found
+
+    # ---------- per column ----------
+
+    def missing_counts(self) -> pd.DataFrame:
+        # same shape as utils.analysis.get_missing_values
+        return pd.DataFrame({"missing_count": self.counts}, index=self.columns)
+
+    # ---------- pairs ----------
+
+    def co_missing(self) -> pd.DataFrame:
+        """Rows where both columns are missing, for every pair of columns with nulls."""
+        return self._kept("co_missing", self._co_missing)
+
+    def _co_missing(self) -> pd.DataFrame:
+        k = len(self.with_nulls)
+        out = np.zeros((k, k), dtype=np.int64)
+        for i in range(k):
+            both = np.bitwise_and(self.bits[i], self.bits[i:])
+            out[i, i:] = popcount(both).sum(axis=1, dtype=np.int64)
+            out[i:, i] = out[i, i:]
+        names = [self.columns[i] for i in self.with_nulls]
+        return pd.DataFrame(out, index=names, columns=names)
+
+    def top_co_missing(self, k: int = 20) -> pd.DataFrame:
+        """Column pairs that are most often missing together (with the share of the rarer column)."""
+        return self._kept("top_co_missing", self._top_co_missing, k)
+
+    def _top_co_missing(self, k: int) -> pd.DataFrame:
+        co = self.co_missing()
+        m = co.to_numpy()
+        i, j = np.triu_indices(len(m), k=1)
+        both = m[i, j]
+        order = np.argsort(-both, kind="stable")[:k]
+        order = order[both[order] > 0]
+        rarer = np.minimum(m[i, i], m[j, j])[order]
+        return pd.DataFrame({
+            "column_1": co.index[i[order]],
+            "column_2": co.index[j[order]],
+            "rows_both_missing": both[order],
+            "share_of_rarer": both[order] / rarer,
+        })
+
+    # ---------- rows ----------
+
+    def by_row_bucket(self, buckets: int = ROW_BUCKETS) -> pd.DataFrame:
+        """
+        Share missing per column in consecutive row ranges (byte-aligned) –
+        the data of the missingness matrix. Index = "first–last row".
+        """
+        return self._kept("by_row_bucket", self._by_row_bucket, buckets)
+
+    def _by_row_bucket(self, buckets: int) -> pd.DataFrame:
+        width = self.bits.shape[1]
+        if width == 0:
+            return pd.DataFrame()
+        step = -(-width // min(buckets, width))
+        starts = np.arange(0, width, step)
+        counts = np.add.reduceat(popcount(self.bits), starts, axis=1, dtype=np.int64)
+        first = starts * 8
+        last = np.minimum(first + step * 8, self.rows)
+        frac = counts / (last - first)
+        out = np.zeros((len(starts), len(self.columns)))
+        out[:, self.with_nulls] = frac.T
+        index = [f"{a + 1:,}–{b:,}" for a, b in zip(first, last)]
+        return pd.DataFrame(out, index=index, columns=self.columns)
+
+    def patterns(self, top: int = 20) -> pd.DataFrame:
+        """
+        Most common combinations of missing columns across rows (rows with
+        no missing value included as "(none)"). Uses the PATTERN_MAX_COLS
+        most-missing columns; nulls in any other column show as "(other)".
+        Rows are decoded chunk by chunk.
+        """
+        return self._kept("patterns", self._patterns, top)
+
+    def _patterns(self, top: int) -> pd.DataFrame:
+        ranked = np.argsort(-self.counts[self.with_nulls], kind="stable")
+        order, rest = ranked[:PATTERN_MAX_COLS], ranked[PATTERN_MAX_COLS:]
+        bits = self.bits[order]
+        names = [self.columns[self.with_nulls[i]] for i in order]
+        if len(rest):
+            # one more bit: missing in any untracked column
+            bits = np.vstack([bits, np.bitwise_or.reduce(self.bits[rest], axis=0)])
+            names.append("(other)")
+
+        totals: dict[int, int] = {}
+        for start in range(0, bits.shape[1], PATTERN_CHUNK_BYTES):
+            rows = min(self.rows - start * 8, PATTERN_CHUNK_BYTES * 8)
+            codes = np.zeros(rows, dtype=np.int64)
+            for b in range(len(names)):
+                row_bits = np.unpackbits(bits[b, start:start + PATTERN_CHUNK_BYTES], count=rows)
+                codes |= row_bits.astype(np.int64) << b
+            values, counts = np.unique(codes, return_counts=True)
+            for v, c in zip(values.tolist(), counts.tolist()):
+                totals[v] = totals.get(v, 0) + c
+
+        best = sorted(totals.items(), key=lambda kv: -kv[1])[:top]
+        return pd.DataFrame({
+            "missing_columns": [
+                ", ".join(n for b, n in enumerate(names) if code >> b & 1) or "(none)" for code, _ in best
+            ],
+            "columns_missing": [bin(code).count("1") for code, _ in best],
+            "rows": [c for _, c in best],
+            "share": [c / max(self.rows, 1) for _, c in best],
+        })
+
+
+def null_bitmaps(df: pd.DataFrame, token=None) -> NullBitmaps:
+    """Bitmaps of `df`; with a `token` (e.g. the session's dataset version) built only once."""
+    if token is None:
+        return NullBitmaps(df)
+    key = ("missing", token)
+    cached = governor.get(key)
+    if cached is None or cached.rows != len(df) or cached.columns != list(df.columns):
+        governor.discard_prefix(key)  # its derived tables too
+        cached = governor.put(key, NullBitmaps(df, token), kind="stats")
+    return cached
+
+
+def append_null_bitmaps(before_token, token, chunk: pd.DataFrame):
+    """
+    After an append: the kept bitmaps of `before_token` extended by the new
+    rows only, kept under `token`. Nothing kept -> built on first use.
+    """
+    before = governor.get(("missing", before_token))
+    governor.discard_prefix(("missing", before_token))  # the old version's tables too
+    if before is not None and before.columns == list(chunk.columns):
+        governor.put(("missing", token), NullBitmaps(chunk, token, before=before), kind="stats")
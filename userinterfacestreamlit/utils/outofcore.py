@@ -0,0 +1,481 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.backend import assemble_describe, pivot_from_groups
+
+from utils.lazy import lazy_import
+from utils.memory import governor
+
+# duckdb is optional – out-of-core mode is off without it (imported on first use)
+duckdb = lazy_import("duckdb")
+
+# ========== Settings ==========
+
+# Where the on-disk DuckDB databases (and their spill files) live
+DUCKDB_DIR_ENV = "ADE_DUCKDB_DIR"
+# Uploads bigger than this (MB) are spooled to disk and queried out-of-core
+OOC_THRESHOLD_ENV = "ADE_OOC_THRESHOLD_MB"
+# Largest sorted copy (MB, estimated from the file size) the data browser may write
+SORT_COPY_ENV = "ADE_SORT_COPY_MB"
+# Optional DuckDB memory cap, e.g. "4GB"
+DUCKDB_MEMORY_ENV = "ADE_DUCKDB_MEMORY_LIMIT"
+# Folder whose files visitors may open by path (unset -> opening by path is off)
+DATA_DIR_ENV = "ADE_DATA_DIR"
+
+OOC_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".parquet")
+SAMPLE_ROWS = 100_000
+# sorted copies (one per filters + sort column) kept in a dataset's database for the data browser
+SORTED_TABLES = 2
+# spooled uploads / database files nobody used for this long are deleted
+STALE_SECONDS = 24 * 3600
+
+_SQL_AGG = {
+    "sum": "COALESCE(SUM({c}), 0)",
+    "mean": "AVG({c})",
+    "count": "COUNT({c})",
+    "min": "MIN({c})",
+    "max": "MAX({c})",
+    "median": "MEDIAN({c})",
+}
+
+_NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "REAL", "DECIMAL",
+)
+
+
+def is_available() -> bool:
+    return duckdb is not None
+
+
+def ooc_threshold_bytes() -> int:
+    return int(float(os.environ.get(OOC_THRESHOLD_ENV, "500")) * 1024 * 1024)
+
+
+def sort_copy_bytes() -> int:
+    return int(float(os.environ.get(SORT_COPY_ENV, "1024")) * 1024 * 1024)
+
+
+def duckdb_dir() -> str:
+    path = os.environ.get(DUCKDB_DIR_ENV) or os.path.join(tempfile.gettempdir(), "auto_data_explorer")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_dir() -> Path | None:
+    path = os.environ.get(DATA_DIR_ENV)
+    return Path(path).resolve() if path else None
+
+
+def server_path(name: str) -> str:
+    """
+    `name` (relative to ADE_DATA_DIR, or absolute) as a file inside that
+    folder. Raises ValueError for anything outside it (.., symlinks included).
+    """
+    base = data_dir()
+    if base is None:
+        raise ValueError("Opening files by path is turned off (set ADE_DATA_DIR).")
+    path = (base / name).resolve()
+    if not path.is_relative_to(base) or not path.is_file():
+        raise ValueError(f"No such file in the data folder: {name}")
+    return str(path)
+
+
+def spool_upload(uploaded_file) -> str:
+    """Copy a Streamlit upload to local disk (chunked) so DuckDB can scan it."""
+    name = os.path.basename(uploaded_file.name)
+    path = os.path.join(duckdb_dir(), f"upload_{uploaded_file.file_id}_{name}")
+    if not os.path.exists(path):
+        uploaded_file.seek(0)
+        with open(path, "wb") as out:
+            while chunk := uploaded_file.read(16 * 1024 * 1024):
+                out.write(chunk)
+    else:
+        os.utime(path)  # in use again – not stale
+    return path
+
+
+def database_path(path: str) -> str:
+    """The DuckDB file that belongs to a data file."""
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(duckdb_dir(), f"{key}.duckdb")
+
+
+# datasets open in any session – their files are never cleaned up
+_open_datasets = weakref.WeakSet()
+
+
+def cleanup_stale(max_age: float = STALE_SECONDS):
+    """
+    Delete spooled uploads and database files untouched for `max_age`
+    seconds (sessions that ended without switching datasets leave them).
+    """
+    in_use = set()
+    for ds in list(_open_datasets):
+        in_use.update({ds.path, ds.db_path, ds.db_path + ".wal"})
+    now = time.time()
+    base = duckdb_dir()
+    for name in os.listdir(base):
+        if not (name.startswith("upload_") or name.endswith((".duckdb", ".duckdb.wal"))):
+            continue
+        path = os.path.join(base, name)
+        try:
+            if path not in in_use and now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def is_spooled(path: str) -> bool:
+    """True for copies made by spool_upload (safe to delete once replaced)."""
+    return os.path.dirname(os.path.abspath(path)) == os.path.abspath(duckdb_dir()) and os.path.basename(path).startswith("upload_")
+
+
+def _literal(text: str) -> str:
+    # quoted SQL string literal
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _q(name: str) -> str:
+    # quoted SQL identifier
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _is_numeric_type(sql_type: str) -> bool:
+    return sql_type.upper().startswith(_NUMERIC_TYPES)
+
+
+def _is_temporal_type(sql_type: str) -> bool:
+    return sql_type.upper().startswith(("TIMESTAMP", "DATE"))
+
+
+# ========== Out-of-core dataset ==========
+
+class DuckDBDataset:
+    """
+    A CSV / Parquet file registered as a view in an on-disk DuckDB database.
+    Filters, aggregates and stats run as SQL; only small results come back.
+    Filters are the page's (column, operator, value) specs.
+    """
+
+    VIEW = "dataset"
+
+    def __init__(self, path: str):
+        if duckdb is None:
+            raise RuntimeError("Out-of-core mode needs the 'duckdb' package.")
+        self.path = os.path.abspath(path)
+        self.file_name = os.path.basename(path)
+        info = os.stat(self.path)
+        # path + size + mtime: cached results of an edited file are never reused
+        self.identity = (self.path, info.st_size, info.st_mtime_ns)
+
+        self.db_path = database_path(self.path)
+        self._con = duckdb.connect(self.db_path)
+        _open_datasets.add(self)
+        self._con.execute(f"SET temp_directory = {_literal(duckdb_dir())}")
+        if os.environ.get(DUCKDB_MEMORY_ENV):
+            self._con.execute(f"SET memory_limit = '{os.environ[DUCKDB_MEMORY_ENV]}'")
+
+        lower = self.path.lower()
+        if lower.endswith(".parquet"):
+            reader = "read_parquet"
+        elif lower.endswith((".csv", ".csv.gz", ".csv.zst")):
+            reader = "read_csv_auto"
+        else:
+            raise ValueError(f"Unsupported file for out-of-core mode: {self.file_name}")
+        # a view only – the data stays in the file, nothing is copied
+        self._con.execute(f"CREATE OR REPLACE VIEW {self.VIEW} AS SELECT * FROM {reader}({_literal(self.path)})")
+
+        schema = self._sql(f"DESCRIBE {self.VIEW}").fetchall()
+        self.sql_types = {row[0]: row[1] for row in schema}
+        self.columns = list(self.sql_types)
+        self.num_rows = self._sql(f"SELECT COUNT(*) FROM {self.VIEW}").fetchone()[0]
+
+        # sorted copies of an older version of the file are dropped
+        self._version = hashlib.sha1(repr(self.identity).encode("utf-8")).hexdigest()[:12]
+        self._sorted: list[str] = []
+        self._lock = threading.Lock()
+        for (name,) in self._sql("SELECT table_name FROM duckdb_tables() WHERE table_name LIKE 'sorted_%'").fetchall():
+            if not name.startswith(f"sorted_{self._version}_"):
+                self._sql(f"DROP TABLE IF EXISTS {_q(name)}")
+
+    def changed(self) -> bool:
+        """True once the file was edited / replaced since it was opened."""
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return True
+        return (self.path, info.st_size, info.st_mtime_ns) != self.identity
+
+    def _sql(self, query: str, params: list | None = None):
+        # one cursor per call – Streamlit sessions run in different threads
+        return self._con.cursor().execute(query, params or [])
+
+    def _cached(self, name: str, args: tuple, compute):
+        """Full-table scans run once per file version + arguments (shared by sessions)."""
+        key = ("ooc", self.identity, name, args)
+        found = governor.get(key)
+        if found is None:
+            found = governor.put(key, compute(), kind="stats")
+        return found
+
+    def close(self):
+        """
+        Drop the sorted browser tables and the connection; a spooled upload
+        copy and its database file are deleted.
+        """
+        _open_datasets.discard(self)
+        with self._lock:
+            for table in self._sorted:
+                self._sql(f"DROP TABLE IF EXISTS {table}")
+            self._sorted.clear()
+        self._con.close()
+        if is_spooled(self.path):
+            for path in (self.path, self.db_path, self.db_path + ".wal"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        governor.discard_prefix(("ooc", self.identity))
+
+    # ---------- filters ----------
+
+    def _where(self, filters: list | None, not_null: tuple = ()) -> tuple[str, list]:
+        conds = [f"{_q(c)} IS NOT NULL" for c in not_null]
+        params = []
+        for col, op, val in filters or []:
+            if col not in self.sql_types:
+                continue
+            c = _q(col)
+            if op == "contains":
+                conds.append(f"regexp_matches(CAST({c} AS VARCHAR), ?, 'i')")
+                params.append(str(val))
+                continue
+            if op not in ("==", "!=", ">", "<", ">=", "<="):
+                continue
+            if _is_numeric_type(self.sql_types[col]):
+                try:
+                    val = float(val)
+                except (TypeError, ValueError):
+                    continue  # like pandas: a bad filter is ignored
+            sql_op = {"==": "="}.get(op, op)
+            if op == "!=":
+                # pandas: NaN != x is True
+                conds.append(f"({c} != ? OR {c} IS NULL)")
+            else:
+                conds.append(f"{c} {sql_op} ?")
+            params.append(val)
+        return (" WHERE " + " AND ".join(conds) if conds else ""), params
+
+    def count(self, filters: list | None = None) -> int:
+        if not filters:
+            return self.num_rows
+        where, params = self._where(filters)
+        return self._cached(
+            "count", tuple(filters),
+            lambda: self._sql(f"SELECT COUNT(*) FROM {self.VIEW}{where}", params).fetchone()[0],
+        )
+
+    def missing_counts(self) -> pd.DataFrame:
+        # same shape as utils.analysis.get_missing_values
+        return self._cached("missing_counts", (), self._missing_counts)
+
+    def _missing_counts(self) -> pd.DataFrame:
+        exprs = ", ".join(f"COUNT(*) - COUNT({_q(c)})" for c in self.columns)
+        row = self._sql(f"SELECT {exprs} FROM {self.VIEW}").fetchone()
+        return pd.Series(row, index=self.columns, dtype="int64").to_frame("missing_count")
+
+    def column_types(self) -> pd.DataFrame:
+        return pd.Series(self.sql_types).to_frame("dtype")
+
+    def basic_info(self) -> dict:
+        # same keys as utils.analysis.get_basic_info
+        return {"rows": self.num_rows, "columns": len(self.columns), "column_names": list(self.columns)}
+
+    # ---------- rows ----------
+
+    def sample(self, n: int = SAMPLE_ROWS) -> pd.DataFrame:
+        """Reservoir sample used by the row-level charts."""
+        if self.num_rows <= n:
+            return self._sql(f"SELECT * FROM {self.VIEW}").df()
+        return self._sql(
+            f"SELECT * FROM {self.VIEW} USING SAMPLE reservoir({int(n)} ROWS) REPEATABLE (42)"
+        ).df()
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        return self._sql(f"SELECT * FROM {self.VIEW} LIMIT {int(n)}").df()
+
+    def page(
+        self,
+        offset: int,
+        limit: int,
+        sort_col: str | None = None,
+        ascending: bool = True,
+        filters: list | None = None,
+    ) -> pd.DataFrame:
+        """
+        One page of rows for the data browser (missing values sort last).
+        A sorted view that fits ADE_SORT_COPY_MB is materialized once per
+        filters + sort; pages are then rowid ranges of that table instead of
+        a full ORDER BY per page flip. Bigger ones use ORDER BY … LIMIT/OFFSET.
+        """
+        if sort_col not in self.sql_types or not self._fits_sort_copy(filters):
+            where, params = self._where(filters)
+            order = ""
+            if sort_col in self.sql_types:
+                order = f" ORDER BY {_q(sort_col)} {'ASC' if ascending else 'DESC'} NULLS LAST"
+            return self._sql(
+                f"SELECT * FROM {self.VIEW}{where}{order} LIMIT {int(limit)} OFFSET {int(offset)}",
+                params,
+            ).df()
+        query = "SELECT * FROM {table} WHERE rowid >= ? AND rowid < ? ORDER BY rowid"
+        bounds = [int(offset), int(offset) + int(limit)]
+        table = self._sorted_table(sort_col, ascending, filters)
+        try:
+            return self._sql(query.format(table=table), bounds).df()
+        except duckdb.CatalogException:
+            # dropped by another session's browser meanwhile – build it again
+            with self._lock:
+                if table in self._sorted:
+                    self._sorted.remove(table)
+            return self._sql(query.format(table=self._sorted_table(sort_col, ascending, filters)), bounds).df()
+
+    def _fits_sort_copy(self, filters: list | None) -> bool:
+        # the copy holds every filtered row – its share of the source file, roughly
+        share = self.count(filters) / max(self.num_rows, 1)
+        return os.path.getsize(self.path) * share <= sort_copy_bytes()
+
+    def _sorted_table(self, sort_col: str, ascending: bool, filters: list | None) -> str:
+        # rows in sort order, stored in the dataset's database file (disk, not RAM)
+        spec = hashlib.sha1(repr((sort_col, ascending, tuple(filters or ()))).encode("utf-8")).hexdigest()[:12]
+        table = f"sorted_{self._version}_{spec}"
+        with self._lock:
+            if table not in self._sorted:
+                where, params = self._where(filters)
+                order = f"{_q(sort_col)} {'ASC' if ascending else 'DESC'} NULLS LAST"
+                self._sql(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM {self.VIEW}{where} ORDER BY {order}", params)
+                self._sorted.append(table)
+                while len(self._sorted) > SORTED_TABLES:
+                    self._sql(f"DROP TABLE IF EXISTS {self._sorted.pop(0)}")
+        return table
+
+    # ---------- aggregates ----------
+
+    def group_agg(self, group_col: str, value_col: str, agg_func: str, filters: list | None = None) -> pd.DataFrame:
+        where, params = self._where(filters, not_null=(group_col,))
+        g, v = _q(group_col), _q(value_col)
+        res = self._sql(
+            f"SELECT {g} AS __g, {_SQL_AGG[agg_func].format(c=v)} AS __v "
+            f"FROM {self.VIEW}{where} GROUP BY {g} ORDER BY {g}",
+            params,
+        ).df()
+        res.columns = [group_col, value_col]
+        return res
+
+    def pivot(self, index: str, columns: str, values: str, aggfunc: str, filters: list | None = None) -> pd.DataFrame:
+        if index == columns:
+            raise ValueError("Rows and Columns must be two different columns.")
+        where, params = self._where(filters, not_null=(index, columns))
+        i, c, v = _q(index), _q(columns), _q(values)
+        agged = self._sql(
+            f"SELECT {i} AS __i, {c} AS __c, {_SQL_AGG[aggfunc].format(c=v)} AS __v "
+            f"FROM {self.VIEW}{where} GROUP BY {i}, {c}",
+            params,
+        ).df()
+        agged.columns = [index, columns, values]
+        return pivot_from_groups(agged, index, columns, values)
+
+    def value_counts(self, col: str, top_n: int = 10, filters: list | None = None) -> pd.DataFrame:
+        where, params = self._where(filters, not_null=(col,))
+        c = _q(col)
+        res = self._sql(
+            f"SELECT {c} AS __k, COUNT(*) AS __n FROM {self.VIEW}{where} "
+            f"GROUP BY {c} ORDER BY __n DESC LIMIT {int(top_n)}",
+            params,
+        ).df()
+        res.columns = [col, "Count"]
+        return res
+
+    def histogram(self, col: str, nbins: int = 20, filters: list | None = None) -> pd.DataFrame:
+        """Equal-width bins computed in SQL -> columns bin_start, bin_end, count."""
+        where, params = self._where(filters, not_null=(col,))
+        c = _q(col)
+        lo, hi = self._sql(f"SELECT MIN({c}), MAX({c}) FROM {self.VIEW}{where}", params).fetchone()
+        if lo is None:
+            return pd.DataFrame({"bin_start": [], "bin_end": [], "count": []})
+        lo, hi = float(lo), float(hi)
+        width = (hi - lo) / nbins if hi > lo else 1.0
+        res = self._sql(
+            f"SELECT LEAST(CAST(FLOOR(({c} - ?) / ?) AS INTEGER), ?) AS b, COUNT(*) AS n "
+            f"FROM {self.VIEW}{where} GROUP BY b ORDER BY b",
+            [lo, width, nbins - 1] + params,
+        ).df()
+        counts = np.zeros(nbins, dtype="int64")
+        counts[res["b"].to_numpy()] = res["n"].to_numpy()
+        starts = lo + width * np.arange(nbins)
+        return pd.DataFrame({"bin_start": starts, "bin_end": starts + width, "count": counts})
+
+    def describe(self, filters: list | None = None) -> pd.DataFrame:
+        """Same table as get_descriptive_stats, computed in SQL (one scan, cached)."""
+        return self._cached("describe", tuple(filters or ()), lambda: self._describe(filters))
+
+    def _top_value(self, col: str, filters: list | None) -> tuple:
+        # most frequent value + its count; a hash aggregate, not one in-memory map
+        where, params = self._where(filters, not_null=(col,))
+        c = _q(col)
+        return self._sql(
+            f"SELECT {c}, COUNT(*) FROM {self.VIEW}{where} GROUP BY {c} ORDER BY 2 DESC LIMIT 1",
+            params,
+        ).fetchone()
+
+    def _describe(self, filters: list | None) -> pd.DataFrame:
+        where, params = self._where(filters)
+        exprs, layout = [], []
+        for col, sql_type in self.sql_types.items():
+            c = _q(col)
+            if _is_numeric_type(sql_type):
+                stats = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+                exprs += [
+                    f"COUNT({c})", f"AVG({c})", f"STDDEV_SAMP({c})", f"MIN({c})",
+                    f"QUANTILE_CONT({c}, 0.25)", f"QUANTILE_CONT({c}, 0.5)",
+                    f"QUANTILE_CONT({c}, 0.75)", f"MAX({c})",
+                ]
+            elif _is_temporal_type(sql_type):
+                stats = ["count", "mean", "min", "25%", "50%", "75%", "max"]
+                exprs += [
+                    f"COUNT({c})", f"MAKE_TIMESTAMP(CAST(AVG(EPOCH_US({c})) AS BIGINT))", f"MIN({c})",
+                    f"QUANTILE_CONT({c}, 0.25)", f"QUANTILE_CONT({c}, 0.5)",
+                    f"QUANTILE_CONT({c}, 0.75)", f"MAX({c})",
+                ]
+            else:
+                # top / freq come from a GROUP BY per column below (it can spill)
+                stats = ["count", "unique", "top", "freq"]
+                exprs += [f"COUNT({c})", f"COUNT(DISTINCT {c})", "NULL", "NULL"]
+            layout.append((col, sql_type, stats))
+        if not exprs:
+            return pd.DataFrame()
+
+        row = self._sql(f"SELECT {', '.join(exprs)} FROM {self.VIEW}{where}", params).fetchone()
+
+        ldesc, pos = [], 0
+        for col, sql_type, stats in layout:
+            vals = list(row[pos:pos + len(stats)])
+            pos += len(stats)
+            if _is_numeric_type(sql_type):
+                vals = [np.nan if v is None else float(v) for v in vals]
+            elif _is_temporal_type(sql_type):
+                vals = [vals[0]] + [pd.NaT if v is None else pd.Timestamp(v).tz_localize(None) for v in vals[1:]]
+            else:
+                vals[2], vals[3] = self._top_value(col, filters) if vals[0] else (np.nan, np.nan)
+            dtype = float if _is_numeric_type(sql_type) else object
+            ldesc.append(pd.Series(vals, index=stats, name=col, dtype=dtype))
+        return assemble_describe(ldesc, pd.Index(self.columns))
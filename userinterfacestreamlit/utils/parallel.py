@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _run_chunk(fn, chunk: list[tuple]) -> list:
+    # one pickled round trip per worker instead of one per task
+    return [fn(*args) for args in chunk]
+
+
+def map_in_processes(fn, arg_tuples: list[tuple], chunked: bool = False) -> list:
+    """
+    fn(*args) for every args tuple, spread over worker processes.
+    One CPU, one task or no process support -> plain loop in this process.
+    chunked=True sends the tasks as one contiguous batch per worker (many
+    small tasks). `fn` must be a module-level function (it is pickled by name).
+    """
+    workers = min(len(arg_tuples), os.cpu_count() or 1)
+    if workers > 1:
+        try:
+            # spawn, not fork – the Streamlit server is multi-threaded
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                if not chunked:
+                    futures = [pool.submit(fn, *args) for args in arg_tuples]
+                    return [f.result() for f in futures]
+                size = -(-len(arg_tuples) // workers)
+                futures = [pool.submit(_run_chunk, fn, arg_tuples[i:i + size]) for i in range(0, len(arg_tuples), size)]
+                return [out for f in futures for out in f.result()]
+        except (OSError, RuntimeError):
+            pass  # no worker processes here – run in this process
+    return [fn(*args) for args in arg_tuples]
@@ -1,11 +1,22 @@
 from io import BytesIO
 import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
 
-def generate_pdf_report(df: pd.DataFrame, summary_text: str) -> BytesIO:
+def generate_pdf_report(
+    df: pd.DataFrame,
+    summary_text: str,
+    rows: int | None = None,
+    desc: pd.DataFrame | None = None,
+) -> BytesIO:
+    """
+    PDF summary of `df`. For an out-of-core dataset pass the full-file row
+    count and describe() table – `df` is then only a sample.
+    """
+    # reportlab is only needed when a report is actually generated
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     styles = getSampleStyleSheet()
@@ -18,7 +29,7 @@ def generate_pdf_report(df: pd.DataFrame, summary_text: str) -> BytesIO:
     elements.append(Spacer(1, 12))
 
     # Basic info
-    info_text = f"Rows: {df.shape[0]} &nbsp;&nbsp;&nbsp; Columns: {df.shape[1]}"
+    info_text = f"Rows: {df.shape[0] if rows is None else rows} &nbsp;&nbsp;&nbsp; Columns: {df.shape[1]}"
     elements.append(Paragraph(info_text, styles["Normal"]))
     elements.append(Spacer(1, 12))
 
@@ -30,8 +41,9 @@ def generate_pdf_report(df: pd.DataFrame, summary_text: str) -> BytesIO:
 
     # Descriptive stats (top few rows)
     try:
-        desc = df.describe().round(3)
-        desc = desc.head(8)
+        if desc is None:
+            desc = df.describe()
+        desc = desc.round(3).head(8)
         table_data = [ ["Column"] + desc.columns.tolist() ]
         for idx, row in desc.iterrows():
             table_data.append([str(idx)] + [str(v) for v in row.values])
@@ -0,0 +1,343 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import stat
+import threading
+import time
+import uuid
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.fingerprint import frame_fingerprint
+from utils.lazy import LazyModule
+from utils.memory import dataset_token, governor
+
+pio = LazyModule("plotly.io")
+
+# ========== Settings ==========
+
+# seconds a shared result stays valid
+RESULT_TTL_ENV = "ADE_RESULT_CACHE_TTL"
+# optional folder for a disk copy (survives restarts, shared by app processes)
+RESULT_DIR_ENV = "ADE_RESULT_CACHE_DIR"
+# disk budget (MB) for that folder; oldest files go first
+RESULT_DISK_MB_ENV = "ADE_RESULT_CACHE_DISK_MB"
+
+
+def ttl_seconds() -> float:
+    return float(os.environ.get(RESULT_TTL_ENV, "3600"))
+
+
+def disk_budget_bytes() -> int:
+    return int(float(os.environ.get(RESULT_DISK_MB_ENV, "512")) * 1024 * 1024)
+
+
+# ========== Figures as JSON ==========
+
+class _FigureJSON(str):
+    """A plotly figure serialized with fig.to_json() – rebuilt per reader."""
+
+
+def _is_figure(value) -> bool:
+    return hasattr(value, "to_plotly_json") and hasattr(value, "to_json")
+
+
+def _freeze(value):
+    # sessions never share a mutable figure object, and stored entries stay small
+    if _is_figure(value):
+        return _FigureJSON(value.to_json())
+    if isinstance(value, (tuple, list)):
+        return type(value)(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, _FigureJSON):
+        return pio.from_json(str(value))
+    if isinstance(value, (tuple, list)):
+        return type(value)(_thaw(v) for v in value)
+    return value
+
+
+# ========== Disk format (JSON, tables as Parquet – never pickle) ==========
+
+def _parquet(frame: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    try:
+        frame.to_parquet(buf)
+    except (ValueError, TypeError):
+        # mixed-type columns (e.g. describe() over dates and numbers) are kept as text
+        buf = io.BytesIO()
+        mixed = frame.select_dtypes(include="object").columns
+        frame.astype({c: "string" for c in mixed}).to_parquet(buf)
+    return buf.getvalue()
+
+
+def _encode(value):
+    # TypeError / ValueError -> the value is kept in memory only
+    if isinstance(value, _FigureJSON):
+        return {"figure": str(value)}
+    if isinstance(value, pd.DataFrame):
+        return {"frame": base64.b64encode(_parquet(value)).decode("ascii")}
+    if isinstance(value, (tuple, list)):
+        return {type(value).__name__: [_encode(v) for v in value]}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return {"value": value}
+    raise TypeError(f"{type(value).__name__} is not stored on disk")
+
+
+def _decode(node: dict):
+    (kind, data), = node.items()
+    if kind == "figure":
+        return _FigureJSON(data)
+    if kind == "frame":
+        return pd.read_parquet(io.BytesIO(base64.b64decode(data)))
+    if kind in ("tuple", "list"):
+        items = [_decode(v) for v in data]
+        return tuple(items) if kind == "tuple" else items
+    if kind == "value":
+        return data
+    raise ValueError(f"unknown entry {kind!r}")
+
+
+def _private_dir(path: str) -> str | None:
+    """
+    `path` created with mode 0700; None (memory only, with a warning) when it
+    belongs to another user or others may write to it – they could plant results.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.stat(path)
+    except OSError as e:
+        warnings.warn(f"{RESULT_DIR_ENV}: {e} – shared results stay in memory only")
+        return None
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        warnings.warn(
+            f"{RESULT_DIR_ENV}={path} is owned by another user or writable by others – "
+            "shared results stay in memory only"
+        )
+        return None
+    return path
+
+
+# ========== Cache ==========
+
+class ResultCache:
+    """
+    Aggregates + figure JSON shared by every session of the process, keyed
+    by a query fingerprint (dataset hash, filters, mode, parameters).
+    Memory copies live in the memory governor (kind "results", LRU within
+    its budget); with ADE_RESULT_CACHE_DIR set, a disk copy is kept too.
+    """
+
+    def __init__(self, ttl: float, directory: str | None, disk_budget: int):
+        self.ttl = ttl
+        self.directory = _private_dir(directory) if directory else None
+        self.disk_budget = disk_budget
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "stored": 0}
+
+    @staticmethod
+    def digest(parts: tuple) -> str:
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json")
+
+    # ---------- fetch ----------
+
+    def get(self, parts: tuple):
+        """Cached value for `parts` (figures rebuilt from JSON), or None."""
+        digest = self.digest(parts)
+        entry = governor.get(("results", digest))
+        source = "memory_hits"
+        if entry is None and self.directory:
+            entry = self._read_disk(digest)
+            source = "disk_hits"
+            if entry is not None:
+                governor.put(("results", digest), entry, kind="results")
+        if entry is None:
+            self._count("misses")
+            return None
+        created, frozen = entry
+        if time.time() - created > self.ttl:
+            self.discard(parts)
+            self._count("expired")
+            self._count("misses")
+            return None
+        self._count(source)
+        return _thaw(frozen)
+
+    def _read_disk(self, digest: str):
+        try:
+            with open(self._path(digest), encoding="utf-8") as f:
+                stored = json.load(f)
+            return stored["created"], _decode(stored["value"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None  # missing, half-written by an old version, or not ours
+
+    # ---------- store ----------
+
+    def put(self, parts: tuple, value):
+        """Keep `value` for other sessions; returns it unchanged."""
+        digest = self.digest(parts)
+        entry = (time.time(), _freeze(value))
+        governor.put(("results", digest), entry, kind="results")
+        if self.directory:
+            self._write_disk(digest, entry)
+        self._count("stored")
+        return value
+
+    def _write_disk(self, digest: str, entry: tuple):
+        tmp = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        created, frozen = entry
+        try:
+            stored = json.dumps({"created": created, "value": _encode(frozen)})
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(stored)
+            os.replace(tmp, self._path(digest))  # readers never see half a file
+        except (OSError, TypeError, ValueError, ImportError, NotImplementedError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, path))
+        total = sum(f[1] for f in files)
+        now = time.time()
+        for mtime, size, path in sorted(files):
+            if total <= self.disk_budget and now - mtime <= self.ttl:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def discard(self, parts: tuple):
+        digest = self.digest(parts)
+        governor.discard(("results", digest))
+        if self.directory:
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+
+    # ---------- report ----------
+
+    def hit_rate(self) -> float | None:
+        s = self.stats
+        hits = s["memory_hits"] + s["disk_hits"]
+        return hits / (hits + s["misses"]) if hits + s["misses"] else None
+
+
+result_cache = ResultCache(ttl_seconds(), os.environ.get(RESULT_DIR_ENV) or None, disk_budget_bytes())
+
+
+def cached(parts: tuple, build, *args, **kwargs):
+    """result_cache value for `parts`, else build(*args, **kwargs) – stored for everyone."""
+    value = result_cache.get(parts)
+    if value is None:
+        value = result_cache.put(parts, build(*args, **kwargs))
+    return value
+
+
+def cached_job(job, parts: tuple, build, *args, **kwargs):
+    """Job function: a shared result when another session already built it, else build(job, ...)."""
+    value = result_cache.get(parts)
+    if value is None:
+        value = result_cache.put(parts, build(job, *args, **kwargs))
+    return value
+
+
+# ========== Dataset identity ==========
+
+def dataset_hash(state, df: pd.DataFrame) -> str:
+    """
+    Content hash of the session's data – the same file opened by two analysts
+    gets the same hash. Computed once per dataset version.
+    """
+    key = ("dataset_hash", dataset_token(state))
+    found = governor.get(key)
+    if found is None:
+        ooc = state.get("ooc")
+        if ooc is not None:
+            # the file itself (path, size, mtime) + its sample – an edit in place is a new dataset
+            path, size, mtime = ooc.identity
+            found = f"ooc:{path}:{size}:{mtime}:{ooc.num_rows}:{frame_fingerprint(df)}"
+        else:
+            found = ResultCache.digest((columns_hash(state, df, df.columns), df.shape))
+        governor.put(key, found, kind="stats")
+    return found
+
+
+def _column_hash(s: pd.Series, before: str = "") -> str:
+    h = hashlib.sha1(before.encode("utf-8"))
+    h.update(str(s.dtype).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(s, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def column_hashes(state, df: pd.DataFrame) -> dict:
+    """Content hash per column of the session's data, computed once per dataset version."""
+    key = ("column_hashes", dataset_token(state))
+    found = governor.get(key)
+    if found is None:
+        if state.get("ooc") is not None:
+            whole = dataset_hash(state, df)  # a file queried in place is never appended to
+            found = {col: whole for col in df.columns}
+        else:
+            found = {col: _column_hash(df[col]) for col in df.columns}
+        governor.put(key, found, kind="stats")
+    return found
+
+
+def append_column_hashes(state, base: pd.DataFrame, combined: pd.DataFrame) -> dict:
+    """
+    Column hashes of `combined` (= `base` + new rows) from those of `base`,
+    hashing the new rows only. A column the new rows leave empty (same dtype)
+    keeps its hash – results keyed on it stay cached.
+    """
+    before = column_hashes(state, base)
+    new = combined.iloc[len(base):]
+    out = {}
+    for col, h in before.items():
+        if new[col].isna().all() and combined[col].dtype == base[col].dtype:
+            out[col] = h
+        else:
+            out[col] = _column_hash(new[col], f"{h}:{len(base)}")
+    return out
+
+
+def keep_column_hashes(state, hashes: dict):
+    """Register column hashes for the session's current dataset version."""
+    governor.put(("column_hashes", dataset_token(state)), hashes, kind="stats")
+
+
+def columns_hash(state, df: pd.DataFrame, cols) -> str:
+    """
+    Cache-key part for a result that reads only `cols`: unchanged while
+    those columns are, whatever happens to the others.
+    """
+    hashes = column_hashes(state, df)
+    cols = list(dict.fromkeys(c for c in cols if c is not None))
+    return ResultCache.digest(tuple((str(c), hashes[c]) for c in cols))
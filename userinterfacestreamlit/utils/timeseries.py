@@ -0,0 +1,143 @@
+import warnings
+
+import pandas as pd
+
+# ========== Settings ==========
+
+# most animation frames / line points a chart gets; beyond that timestamps are bucketed
+MAX_FRAMES = 60
+MAX_POINTS = 2000
+# text columns: share of sampled values that must parse to count as dates
+DATE_PARSE_SHARE = 0.9
+DETECT_SAMPLE = 200
+
+# finest first: (label, bucket length used to count buckets, how to show a bucket)
+GRANULARITIES = [
+    ("minute", pd.Timedelta(minutes=1), "%Y-%m-%d %H:%M"),
+    ("hour", pd.Timedelta(hours=1), "%Y-%m-%d %H:00"),
+    ("day", pd.Timedelta(days=1), "%Y-%m-%d"),
+    ("week", pd.Timedelta(weeks=1), "Week of %Y-%m-%d"),
+    ("month", pd.Timedelta(days=31), "%Y-%m"),
+]
+
+
+# ========== Detection / parsing ==========
+
+def _parse(s: pd.Series) -> pd.Series:
+    # format is inferred from the first value; cache=True parses each distinct string once
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return pd.to_datetime(s, errors="coerce", cache=True)
+
+
+def looks_like_dates(s: pd.Series) -> bool:
+    """Datetime dtype, or text whose sampled values (mostly) parse as dates."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return True
+    if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+        return False
+    sample = s.dropna().head(DETECT_SAMPLE)
+    if sample.empty or not sample.map(lambda v: isinstance(v, str)).all():
+        return False
+    return _parse(sample).notna().mean() >= DATE_PARSE_SHARE
+
+
+def datetime_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if looks_like_dates(df[c])]
+
+
+def as_datetime(s: pd.Series) -> pd.Series | None:
+    """`s` as datetimes (None if it is not a date column)."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    return _parse(s) if looks_like_dates(s) else None
+
+
+# ========== Granularity ==========
+
+def pick_granularity(ts: pd.Series, budget: int) -> tuple | None:
+    """
+    Finest granularity whose bucket count over the time span fits `budget`
+    (None when the distinct timestamps already fit).
+    """
+    ts = ts.dropna()
+    if ts.nunique() <= budget:
+        return None
+    span = ts.max() - ts.min()
+    for gran in GRANULARITIES:
+        if span // gran[1] + 1 <= budget:
+            return gran
+    return GRANULARITIES[-1]
+
+
+def bucket(ts: pd.Series, gran: tuple) -> pd.Series:
+    """Start of each timestamp's bucket (vectorized floor)."""
+    label = gran[0]
+    if label == "minute":
+        return ts.dt.floor("min")
+    if label == "hour":
+        return ts.dt.floor("h")
+    if label == "day":
+        return ts.dt.floor("D")
+    # weeks start on Monday, months on the 1st
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_localize(None)
+    return ts.dt.to_period("W" if label == "week" else "M").dt.start_time
+
+
+# ========== Chart preparation ==========
+
+def resample_for_line(df: pd.DataFrame, x_col: str, y_cols: list[str], budget: int = MAX_POINTS) -> tuple[pd.DataFrame, str | None]:
+    """
+    Mean of `y_cols` per time bucket when `x_col` holds more distinct
+    timestamps than `budget`. Returns (frame sorted by x, granularity label or None).
+    Non-date x columns come back unchanged.
+    """
+    ts = as_datetime(df[x_col])
+    if ts is None:
+        return df, None
+    gran = pick_granularity(ts, budget)
+    if gran is None:
+        return df.assign(**{x_col: ts}).sort_values(x_col, kind="stable"), None
+    out = (
+        df[y_cols]
+        .groupby(bucket(ts, gran).rename(x_col), sort=True)
+        .mean()
+        .reset_index()
+    )
+    return out, gran[0]
+
+
+def resample_frames(
+    df: pd.DataFrame,
+    frame_col: str,
+    x_col: str | None = None,
+    y_col: str | None = None,
+    budget: int = MAX_FRAMES,
+    agg: str | None = "sum",
+) -> tuple[pd.DataFrame, str | None]:
+    """
+    Animation frames from a date column: timestamps are bucketed to fit
+    `budget` frames and shown as labels in time order. With `agg`, y is
+    aggregated per (frame, x) – one bar per category and frame; without it
+    rows are kept (scatter). Non-date frame columns come back unchanged.
+    """
+    ts = as_datetime(df[frame_col])
+    if ts is None:
+        return df, None
+    gran = pick_granularity(ts, budget)
+    starts = ts if gran is None else bucket(ts, gran)
+    fmt = "%Y-%m-%d %H:%M:%S" if gran is None else gran[2]
+
+    if agg is not None and x_col is not None and y_col is not None and x_col != frame_col:
+        out = (
+            df[[x_col, y_col]]
+            .groupby([starts.rename("_frame_start"), df[x_col]], sort=True, observed=True)[y_col]
+            .agg(agg)
+            .reset_index()
+        )
+    else:
+        out = df.assign(_frame_start=starts).sort_values("_frame_start", kind="stable")
+    out = out.dropna(subset=["_frame_start"])
+    out[frame_col] = out["_frame_start"].dt.strftime(fmt)
+    return out.drop(columns="_frame_start"), None if gran is None else gran[0]
@@ -0,0 +1,191 @@
+import os
+from functools import lru_cache
+
+import pandas as pd
+import streamlit as st
+
+from utils.backend import FILTER_OPS
+from utils.browser import PAGE_SIZES, browse_page, row_count
+from utils.jobs import runner
+from utils.memory import governor
+from utils.resultcache import result_cache
+
+CSS_FILES = ["assets/style.css", "assets/animation.css"]
+
+
+@lru_cache(maxsize=None)
+def _read_css() -> str:
+    # read from disk once per process, not on every rerun of every page
+    parts = []
+    for css in CSS_FILES:
+        if os.path.exists(css):
+            with open(css) as f:
+                parts.append(f.read())
+    return "\n".join(parts)
+
+
+def load_css():
+    css = _read_css()
+    if css:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+
+def memory_report():
+    """Sidebar line: memory held by datasets, frames and stats of all sessions."""
+    usage = governor.usage()
+    mb = 1024 * 1024
+    line = f"🧠 Memory: {usage['in_memory'] / mb:,.0f} MB of {usage['budget'] / mb:,.0f} MB"
+    if usage["spilled"]:
+        line += f" · {usage['spilled'] / mb:,.0f} MB spilled to disk"
+    with st.sidebar:
+        st.caption(line)
+        with st.expander("Memory details"):
+            st.dataframe(
+                pd.Series(usage["by_kind"], dtype="float64").div(mb).round(1).to_frame("MB")
+            )
+            st.caption(f"{usage['entries']} cached items · hits {usage['hits']} / misses {usage['misses']}")
+            s, rate = result_cache.stats, result_cache.hit_rate()
+            st.caption(
+                f"Shared results: {s['memory_hits']} memory + {s['disk_hits']} disk hits · "
+                f"{s['misses']} misses ({s['expired']} expired)"
+                + ("" if rate is None else f" · hit rate {rate:.0%}")
+            )
+
+
+# ========== Background jobs ==========
+
+def submit_job(slot: str, name: str, fn, *args, key=None, **kwargs):
+    """
+    Start fn(job, *args) in the worker pool; the page slot remembers the job id.
+    A job for another key still running in the slot is cancelled first.
+    """
+    previous = runner.get(st.session_state.get(f"job_{slot}"))
+    if previous is not None and not previous.finished and previous.key != key:
+        previous.cancel()
+    st.session_state.pop(f"rerun_job_{slot}", None)
+    st.session_state[f"job_{slot}"] = runner.submit(name, fn, *args, key=key, **kwargs).id
+
+
+def ensure_job(slot: str, name: str, fn, *args, key=None, **kwargs):
+    """Like submit_job, unless the slot already holds a job for `key` (any status, result kept)."""
+    job = runner.get(st.session_state.get(f"job_{slot}"))
+    if job is None or job.key != key or job.released:
+        submit_job(slot, name, fn, *args, key=key, **kwargs)
+
+
+def retry_requested(slot: str) -> bool:
+    """True after the slot's "Run again" button – the page then submits its job again."""
+    return bool(st.session_state.get(f"rerun_job_{slot}"))
+
+
+@st.fragment(run_every=0.5)
+def _job_progress(job_id: str):
+    # only this panel reruns while the job works; the page itself never waits
+    job = runner.get(job_id)
+    if job is None or job.finished:
+        st.rerun()  # whole page again – it now shows the result
+    st.progress(job.progress, text=f"⏳ {job.name}: {job.message or job.status}")
+    if st.button("✖ Cancel", key=f"cancel_{job_id}"):
+        job.cancel()
+
+
+def job_result(slot: str, key=None):
+    """
+    Result of the slot's job if it is done (and was started for `key`).
+    While it runs, a progress bar with a cancel button is shown instead
+    (never blocks the rerun); the job keeps running across reruns and page switches.
+    """
+    job = runner.get(st.session_state.get(f"job_{slot}"))
+    if job is None or (key is not None and job.key != key):
+        return None
+    if job.status == "done":
+        result = job.result
+        if result is not None:
+            return result
+    if not job.finished:
+        _job_progress(job.id)
+        return None
+    if job.status == "failed":
+        st.error(f"❌ {job.name} failed: {job.error}")
+    elif job.status == "cancelled":
+        st.info(f"{job.name} was cancelled.")
+    else:
+        st.info(f"{job.name}: the result was released to free memory.")
+    if st.button("🔄 Run again", key=f"retry_{slot}"):
+        # the page submits the job again with its current arguments
+        st.session_state.pop(f"job_{slot}", None)
+        st.session_state[f"rerun_job_{slot}"] = True
+        st.rerun()
+    return None
+
+
+# ========== Filters (chart page, data browser) ==========
+
+def filter_panel(df: pd.DataFrame, key_prefix: str = "") -> list[tuple]:
+    """Simple 2-filter panel, but concept = df.loc[…] -> list of (column, operator, value)"""
+    filters = []
+    with st.expander("🔎 Optional Filters (uses loc-style idea)", expanded=False):
+        st.caption("Example logic: df.loc[df['Gender'] == 'Male']")
+
+        # Filter 1
+        enable_1 = st.checkbox("Enable Filter 1", key=f"{key_prefix}f1_on")
+        if enable_1:
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                f1_col = st.selectbox("Column 1", df.columns, key=f"{key_prefix}f1_col")
+            with c2:
+                f1_op = st.selectbox("Operator 1", FILTER_OPS, key=f"{key_prefix}f1_op")
+            with c3:
+                if pd.api.types.is_numeric_dtype(df[f1_col]):
+                    f1_val = st.number_input("Value 1", key=f"{key_prefix}f1_val")
+                else:
+                    f1_val = st.text_input("Value 1", key=f"{key_prefix}f1_val")
+
+            filters.append((f1_col, f1_op, f1_val))
+
+        # Filter 2
+        enable_2 = st.checkbox("Enable Filter 2", key=f"{key_prefix}f2_on")
+        if enable_2:
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                f2_col = st.selectbox("Column 2", df.columns, key=f"{key_prefix}f2_col")
+            with c2:
+                f2_op = st.selectbox("Operator 2", FILTER_OPS, key=f"{key_prefix}f2_op")
+            with c3:
+                if pd.api.types.is_numeric_dtype(df[f2_col]):
+                    f2_val = st.number_input("Value 2", key=f"{key_prefix}f2_val")
+                else:
+                    f2_val = st.text_input("Value 2", key=f"{key_prefix}f2_val")
+
+            filters.append((f2_col, f2_op, f2_val))
+
+    return filters
+
+
+# ========== Data browser ==========
+
+def data_browser(df: pd.DataFrame, key: str, ooc=None):
+    """
+    Page-by-page table view with sort + filters. Only one page of rows is
+    sent to the browser; with an out-of-core dataset the page is a SQL query.
+    """
+    filters = filter_panel(df, key_prefix=f"{key}_")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        sort_col = st.selectbox("Sort by", [None] + list(df.columns), key=f"{key}_sort")
+    with c2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True, key=f"{key}_order") == "Ascending"
+    with c3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_size")
+
+    total = ooc.count(filters) if ooc is not None else row_count(df, filters)
+    pages = max(1, -(-total // page_size))
+    page = st.number_input("Page", 1, pages, 1, key=f"{key}_page") - 1
+
+    if ooc is not None:
+        rows = ooc.page(page * page_size, page_size, sort_col, ascending, filters)
+    else:
+        rows = browse_page(df, page, page_size, sort_col, ascending, filters)
+    st.dataframe(rows)
+    first = page * page_size + 1 if total else 0
+    st.caption(f"Rows {first:,}–{page * page_size + len(rows):,} of {total:,} · page {page + 1:,} of {pages:,}")